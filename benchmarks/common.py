@@ -0,0 +1,25 @@
+"""Helpers shared by the benchmark scripts."""
+import time
+
+
+def settle(game, seconds):
+    """Runs update() until background work (asset loads, video prefetch) has gone quiet."""
+    end = time.perf_counter() + seconds
+    while any(not isinstance(job, PendingJob) for job in game.asset_jobs) or time.perf_counter() < end:
+        game.update()
+        time.sleep(0.01)
+
+
+class PendingJob:
+    """
+    Asset job that never finishes, half done. With one in game.asset_jobs the
+    loading screen stays on screen (with a partly filled bar) while it is measured.
+    """
+    groups = ()
+    newly_resident = False
+    done = False
+    total_bytes = 2
+    done_bytes = 1
+
+    def poll(self):
+        return self.done_bytes / self.total_bytes
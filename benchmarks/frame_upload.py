@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: numpy frame -> display surface upload.
+
+Compares the old path (np.swapaxes + pygame.surfarray.make_surface, one new
+Surface per frame) with the VideoPlayer path (raw ffmpeg frame written into one
+preallocated Surface). Run from the project root:
+
+    python benchmarks/frame_upload.py [--frames 120] [--size 800x600] [--clip assets/images/PerroentraCaja.mp4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import numpy as np
+import imageio_ffmpeg
+from scripts.media.frame_format import FRAME_PIX_FMT, make_frame_surface, upload_frame
+
+
+def read_frames(clip, size, count, pix_fmt, bpp):
+    stream = imageio_ffmpeg.read_frames(clip, pix_fmt=pix_fmt, bpp=bpp, output_params=["-s", "%dx%d" % size])
+    next(stream)
+    frames = []
+    for raw in stream:
+        frames.append(raw)
+        if len(frames) >= count:
+            break
+    stream.close()
+    return frames
+
+
+def measure(name, frames, upload):
+    surfaces = set()
+    timings = []
+    tracemalloc.start()
+    for raw in frames:
+        t = time.perf_counter()
+        surface = upload(raw)
+        timings.append((time.perf_counter() - t) * 1000)
+        surfaces.add(id(surface))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pixel_bytes = len(surfaces) * surface.get_pitch() * surface.get_height()
+    return {
+        "path": name,
+        "mean_ms": statistics.mean(timings),
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1],
+        "surfaces_allocated": len(surfaces),
+        "surface_mb_allocated": pixel_bytes / (1024 * 1024),
+        "python_peak_mb": peak / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--size", default="800x600")
+    parser.add_argument("--clip", default=os.path.join("assets", "images", "PerroentraCaja.mp4"))
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+
+    pygame.init()
+    pygame.display.set_mode(size)
+    w, h = size
+
+    rgb_frames = read_frames(args.clip, size, args.frames, "rgb24", 3)
+    raw_frames = read_frames(args.clip, size, args.frames, FRAME_PIX_FMT, 4)
+
+    # Keep every surface alive, as the old code did through video_frame_surface,
+    # so ids are not recycled and each allocation is counted.
+    kept = []
+
+    def make_surface_path(raw):
+        frame = np.frombuffer(raw, dtype=np.uint8).reshape((h, w, 3))
+        surface = pygame.surfarray.make_surface(np.swapaxes(frame, 0, 1))
+        kept.append(surface)
+        return surface
+
+    target = make_frame_surface(size)
+
+    def preallocated_path(raw):
+        upload_frame(target, raw)
+        return target
+
+    results = [
+        measure("make_surface", rgb_frames, make_surface_path),
+        measure("preallocated", raw_frames, preallocated_path),
+    ]
+    print(f"{len(rgb_frames)} frames at {w}x{h}")
+    for r in results:
+        print(
+            f"{r['path']:>13}: {r['mean_ms']:.3f} ms/frame (p95 {r['p95_ms']:.3f}), "
+            f"{r['surfaces_allocated']} surfaces / {r['surface_mb_allocated']:.1f} MB pixels allocated, "
+            f"python peak {r['python_peak_mb']:.2f} MB"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Benchmark suite: game loop and media paths with the real assets.
+
+Runs under the SDL dummy drivers at a fixed window size and measures
+  startup   time from the first import to the first menu frame (fresh process)
+  assets    synchronous load of every scene group with cold caches
+  draw      Game.draw() per state: p50/p95/p99/max; static screens also with a forced full redraw
+  resize    latency of the first (preview) frame after a VIDEORESIZE and of the settle rebuild,
+            for sizes never seen (cold) and seen before (warm)
+  video     decoded frames per second: ffmpeg scaling to the window, and source size + smoothscale
+
+Results are a flat {metric: value} JSON. With --compare, every metric is checked
+against a stored baseline and the run fails if any regressed (p99 and max are
+reported but only gated with --gate-tails). From the project root:
+
+    python benchmarks/suite.py --output benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json [--output current.json]
+    python benchmarks/suite.py --compare benchmarks/baseline.json --current current.json
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import PendingJob, settle
+from scripts.utils.stats import percentile
+
+DECISION_STATES = ["level1", "level2_sano", "level2_enfermo", "level3", "level4", "level5_intro"]
+RESIZE_SIZES = [(1024, 768), (1280, 720), (640, 480), (1366, 768), (900, 700)]
+
+
+def percentiles(prefix, timings):
+    return {
+        f"{prefix}.p50_ms": percentile(timings, 0.50),
+        f"{prefix}.p95_ms": percentile(timings, 0.95),
+        f"{prefix}.p99_ms": percentile(timings, 0.99),
+        f"{prefix}.max_ms": max(timings),
+    }
+
+
+def median_of_rounds(rounds, measure):
+    """Runs `measure()` (a dict of metrics) `rounds` times and keeps the median of each metric."""
+    samples = [measure() for _ in range(rounds)]
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def time_frames(prefix, frames, before_frame, draw):
+    timings = []
+    for _ in range(frames):
+        before_frame()
+        t = time.perf_counter()
+        draw()
+        timings.append((time.perf_counter() - t) * 1000)
+    return percentiles(prefix, timings)
+
+
+def make_game(size):
+    import pygame
+    from scripts.game import Game
+    from scripts.simulation import NullPrefetcher
+
+    # Los guiños del menú usan random: misma semilla, mismos frames
+    random.seed(0)
+    game = Game()
+    # Precargar videos en segundo plano mete ruido en cada frame; el decodificado se mide aparte
+    game.prefetcher.cancel()
+    game.prefetcher = NullPrefetcher()
+    if game.screen.get_size() != size:
+        game.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        game.resize_elements(*size)
+    game.draw()
+    settle(game, 0.5)
+    return game
+
+
+# --------------------------------------------------
+# STARTUP (runs in a fresh process)
+# --------------------------------------------------
+def startup_probe():
+    """Times imports, Game() and the first menu frame of this process; prints them as JSON."""
+    t_imports = time.perf_counter()
+    import pygame
+    from scripts.game import Game
+    t_init = time.perf_counter()
+    game = Game()
+    t_frame = time.perf_counter()
+    game.present_first_frame()
+    t_end = time.perf_counter()
+    print(json.dumps({
+        "imports_ms": (t_init - t_imports) * 1000,
+        "init_ms": (t_frame - t_init) * 1000,
+        "first_frame_ms": (t_end - t_frame) * 1000,
+        "total_ms": (t_end - _T0) * 1000,
+    }))
+    game.prefetcher.cancel()
+    pygame.quit()
+
+
+def bench_startup(runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-probe"],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {f"startup.{key}": statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+# --------------------------------------------------
+# IN-PROCESS BENCHMARKS
+# --------------------------------------------------
+def bench_assets():
+    from scripts.utils.resource_manager import ResourceManager
+
+    results = {}
+    total = 0.0
+    for group in ResourceManager.manifest()["groups"]:
+        # Caché fría: ni la imagen ni sus copias escaladas
+        ResourceManager._images.pin(())
+        for key in list(ResourceManager._images):
+            del ResourceManager._images[key]
+        for key in list(ResourceManager._scaled):
+            del ResourceManager._scaled[key]
+        ResourceManager._resident_groups.clear()
+        t = time.perf_counter()
+        ResourceManager.load_group(group)
+        ms = (time.perf_counter() - t) * 1000
+        results[f"assets.load_group.{group}_ms"] = ms
+        total += ms
+    results["assets.all_groups_ms"] = total
+    return results
+
+
+def enter_state(game, state):
+    from scripts.utils.resource_manager import ResourceManager
+
+    game.state = state
+    game.fade_alpha = 0
+    game.asset_jobs = [job for job in game.asset_jobs if not isinstance(job, PendingJob)]
+    if ResourceManager.has_group(state):
+        ResourceManager.load_group(state)
+    if state == "loading":
+        # Sin trabajos pendientes update() pasaría enseguida al fundido hacia el nivel
+        game.asset_jobs.append(PendingJob())
+    game.update()
+    game.presented_scene = None
+    game.draw()
+    settle(game, 0.3)
+
+
+def bench_draw(game, frames, clip, rounds):
+    import pygame
+
+    def full_redraw():
+        game.presented_scene = None
+
+    results = {}
+    for state in ["menu", "loading"] + DECISION_STATES + ["ending_screen"]:
+        enter_state(game, state)
+        results.update(median_of_rounds(rounds, lambda: time_frames(f"draw.{state}", frames, lambda: None, game.draw)))
+        if game.is_static_screen():
+            results.update(median_of_rounds(rounds, lambda: time_frames(f"draw.{state}.full", frames, full_redraw, game.draw)))
+
+    # Video en reproducción: los frames avanzan con el reloj real, como en el juego
+    enter_state(game, "level1")
+    game.start_video(clip, return_state="level1")
+    clock = pygame.time.Clock()
+    timings = []
+    while len(timings) < frames and game.state == "playing_video":
+        clock.tick(60)
+        game.update()
+        t = time.perf_counter()
+        game.draw()
+        # Mientras el reproductor abre ffmpeg en su hilo no hay frame que dibujar
+        if game.video_frame_surface is not None:
+            timings.append((time.perf_counter() - t) * 1000)
+    results.update(percentiles("draw.playing_video", timings))
+    game.stop_video()
+    return results
+
+
+def bench_resize(game, base_size):
+    import pygame
+    import constantes
+
+    results = {}
+    for state in ["menu", "level1"]:
+        enter_state(game, state)
+        for label in ("cold", "warm"):
+            preview, final = [], []
+            for size in RESIZE_SIZES + [base_size]:
+                pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, size=size, w=size[0], h=size[1]))
+                t = time.perf_counter()
+                game.handle_events()
+                game.update()
+                game.draw()
+                preview.append((time.perf_counter() - t) * 1000)
+                # Sin esperar RESIZE_SETTLE_MS: la siguiente vuelta ya rehace con smoothscale
+                game.resize_changed_at -= constantes.RESIZE_SETTLE_MS
+                t = time.perf_counter()
+                game.update()
+                game.draw()
+                final.append((time.perf_counter() - t) * 1000)
+            results[f"resize.{state}.preview_{label}_ms"] = statistics.median(preview)
+            results[f"resize.{state}.settle_{label}_ms"] = statistics.median(final)
+    return results
+
+
+def bench_video(game, clip, frames, size):
+    from scripts.media.video_player import VideoPlayer
+
+    results = {}
+    path = game.video_path(clip)
+    for label, output_size in (("ffmpeg_scale", size), ("smoothscale", None)):
+        player = VideoPlayer(path, output_size).start()
+        # Abrir ffmpeg (en el hilo del reproductor) no cuenta como decodificado
+        while not player.is_ready():
+            time.sleep(0.001)
+        count = min(frames, player.total_frames - 1)
+        t = time.perf_counter()
+        for index in range(count):
+            # Cada frame: esperar al decodificador, subirlo a la superficie y, si hace falta, escalarlo
+            while player.current_index < index and player.error is None:
+                player.frame_for_time(index / player.fps)
+            player.scaled_surface(size)
+        elapsed = time.perf_counter() - t
+        player.close()
+        results[f"video.{label}_fps"] = count / elapsed
+    return results
+
+
+# --------------------------------------------------
+# RESULTS
+# --------------------------------------------------
+def higher_is_better(metric):
+    return metric.endswith("_fps")
+
+
+def is_tail(metric):
+    # p99 y máximo de unos cientos de frames dependen de un solo frame lento; se informan, no se exigen
+    return metric.endswith((".p99_ms", ".max_ms"))
+
+
+def compare(baseline, current, threshold, min_delta_ms, gate_tails=False):
+    """Prints every shared metric and returns the names of those that regressed."""
+    regressions = []
+    print(f"{'metric':<44} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric in sorted(set(baseline["metrics"]) & set(current["metrics"])):
+        old, new = baseline["metrics"][metric], current["metrics"][metric]
+        change = (new - old) / old if old else 0.0
+        if is_tail(metric) and not gate_tails:
+            worse = False
+        elif higher_is_better(metric):
+            worse = change < -threshold
+        else:
+            # Las métricas muy pequeñas oscilan en porcentaje sin importar en la práctica
+            worse = change > threshold and new - old > min_delta_ms
+        flag = "REGRESSION" if worse else ""
+        if worse:
+            regressions.append(metric)
+        print(f"{metric:<44} {old:>10.3f} {new:>10.3f} {change:>+7.0%}  {flag}")
+    for metric in sorted(set(baseline["metrics"]) - set(current["metrics"])):
+        print(f"{metric:<44} missing from the current run")
+    return regressions
+
+
+def run(args, size):
+    import pygame
+
+    metrics = {}
+    print("startup...", file=sys.stderr)
+    metrics.update(bench_startup(args.startup_runs))
+    game = make_game(size)
+    print("draw...", file=sys.stderr)
+    metrics.update(bench_draw(game, args.frames, args.clip, args.rounds))
+    print("resize...", file=sys.stderr)
+    metrics.update(bench_resize(game, size))
+    print("video...", file=sys.stderr)
+    metrics.update(bench_video(game, args.clip, args.frames, size))
+    game.prefetcher.cancel()
+    print("assets...", file=sys.stderr)
+    metrics.update(bench_assets())
+    pygame.quit()
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "meta": {
+            "size": list(size),
+            "frames": args.frames,
+            "clip": args.clip,
+            "commit": commit,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="800x600")
+    parser.add_argument("--frames", type=int, default=120, help="Frames measured per state and per clip.")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per state; each percentile is the median across rounds.")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh processes timed for startup (median).")
+    parser.add_argument("--clip", default="PerroentraCaja.mp4", help="Clip (under assets/images) for the video benchmarks.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare with a stored results file; exit 1 on regressions.")
+    parser.add_argument("--current", help="With --compare: compare this results file instead of running the suite.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change counted as a regression.")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this.")
+    parser.add_argument("--gate-tails", action="store_true", help="Also fail on p99/max regressions (noisy).")
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_probe:
+        startup_probe()
+        return
+
+    size = tuple(int(v) for v in args.size.split("x"))
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        results = run(args, size)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        if not args.compare:
+            for metric, value in sorted(results["metrics"].items()):
+                print(f"{metric:<44} {value:>10.3f}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["size"] != results["meta"]["size"]:
+            print(f"Baseline was measured at {baseline['meta']['size']}, this run at {results['meta']['size']}")
+        regressions = compare(baseline, results, args.threshold, args.min_delta_ms, args.gate_tails)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: per-frame cost of the fade transitions.
+
+Times Game.draw() through each transition (menu fade-out, level fade-in from
+black, fade-out of the last video frame and the decision screen -> video
+crossfade) and compares it with recomposing the scene and blitting a black
+alpha overlay on every frame, as the fades used to. Run from the project root:
+
+    python benchmarks/transitions.py [--frames 120] [--size 800x600]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from benchmarks.common import settle
+from scripts.game import Game
+from scripts.utils.stats import percentile
+
+
+def summarize(name, timings):
+    return {
+        "transition": name,
+        "mean_ms": statistics.mean(timings),
+        "p95_ms": percentile(timings, 0.95),
+    }
+
+
+def run_fade(game, state, frames, alphas, legacy_scene=None):
+    """Draws `frames` frames of `state` with fade_alpha following `alphas`; returns ms per frame."""
+    game.state = state
+    game.transition = None
+    overlay = pygame.Surface(game.screen.get_size())
+    overlay.fill((0, 0, 0))
+    timings = []
+    for i in range(frames):
+        game.fade_alpha = alphas(i / max(1, frames - 1))
+        t = time.perf_counter()
+        if legacy_scene is None:
+            game.draw()
+        else:
+            legacy_scene()
+            overlay.set_alpha(game.fade_alpha)
+            game.screen.blit(overlay, (0, 0))
+            pygame.display.flip()
+        timings.append((time.perf_counter() - t) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--size", default="800x600")
+    parser.add_argument("--clip", default="PerroentraCaja.mp4", help="Clip (under assets/images) for the video transitions.")
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+
+    game = Game()
+    if game.screen.get_size() != size:
+        game.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        game.resize_elements(*size)
+    # Background asset loads and prefetching would compete with the draws
+    game.draw()
+    settle(game, 0.5)
+
+    fade_out = lambda p: int(255 * p)
+    fade_in = lambda p: max(1, int(255 * (1 - p)))
+    results = []
+
+    results.append(summarize("menu -> black", run_fade(game, "fading", args.frames, fade_out)))
+    results.append(summarize("menu -> black (legacy)", run_fade(game, "fading", args.frames, fade_out, game.draw_menu)))
+
+    game.state = "level1"
+    settle(game, 1.5)
+    results.append(summarize("black -> level1", run_fade(game, "level1", args.frames, fade_in)))
+    results.append(summarize("black -> level1 (legacy)", run_fade(game, "level1", args.frames, fade_in, game.draw_static_scene)))
+
+    # Decision screen -> first frames of a clip
+    game.fade_alpha = 0
+    game.draw()
+    game.start_video(args.clip, return_state="level1")
+    while game.video_player and game.video_player.current_surface is None:
+        game.update()
+    timings = []
+    while game.video_crossfade is not None and game.state == "playing_video":
+        game.update()
+        t = time.perf_counter()
+        game.draw()
+        timings.append((time.perf_counter() - t) * 1000)
+    results.append(summarize("level1 -> video crossfade", timings))
+
+    def legacy_video():
+        game.screen.blit(game.video_last_frame_surface, game.video_draw_rect)
+        game.screen.blit(game.title_video, game.title_video_pos)
+
+    results.append(summarize("video -> black", run_fade(game, "fading_from_video", args.frames, fade_out)))
+    results.append(summarize("video -> black (legacy)", run_fade(game, "fading_from_video", args.frames, fade_out, legacy_video)))
+    game.stop_video()
+
+    print(f"{args.frames} frames per transition at {size[0]}x{size[1]}")
+    for r in results:
+        print(f"{r['transition']:>26}: {r['mean_ms']:.3f} ms/frame (p95 {r['p95_ms']:.3f})")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
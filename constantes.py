@@ -13,3 +13,40 @@ COLOR_LOADING = (90, 200, 120)
 PLAYER_VEL = 5
 PLAYER_ALTO = 50
 PLAYER_ANCHO = 50
+
+# Video
+VIDEO_BUFFER_SIZE = 8  # Frames decodificados por adelantado en el hilo de video
+VIDEO_SCRUB_SECONDS = 5  # Salto al adelantar/retroceder con las flechas
+VIDEO_SYNC_REPORT = False  # Imprime la deriva audio/video al terminar cada clip
+VIDEO_CROSSFADE_MS = 400  # Fundido cruzado de la pantalla de decisión al primer frame del video (0 = corte)
+VIDEO_CACHE_MAX_CLIP_MB = 64  # python -m scripts.media.video_cache no cachea clips que superen este tamaño
+VIDEO_CACHE_JPEG_BYTES_PER_PIXEL = 0.15  # Estimación del tamaño de un frame JPEG en la caché (medido a 800x600)
+
+# Carga de assets
+ASSET_LOADER_THREADS = 4  # Hilos que decodifican imágenes (también las del menú, en paralelo, al arrancar)
+STARTUP_REPORT = False  # Imprime el timeline de arranque (imports, pantalla, assets del menú, primer frame)
+ATLAS_PAGE_WIDTH = 2048  # Ancho de cada atlas de sprites (python -m scripts.utils.atlas)
+ATLAS_PADDING = 2  # Separación entre sprites dentro del atlas
+ATLAS_TRIM_MIN_ALPHA = 8  # Al empaquetar se recortan los bordes con alpha menor a este valor
+
+# Memoria de assets (cachés LRU de ResourceManager)
+IMAGE_CACHE_BUDGET_MB = 128  # Imágenes originales; las de la escena actual nunca se desalojan
+SOUND_CACHE_BUDGET_MB = 32  # Sonidos decodificados
+FONT_CACHE_BUDGET_MB = 4  # Fuentes abiertas
+FONT_CACHE_ENTRY_BYTES = 64 * 1024  # Estimación por fuente (pygame no expone su tamaño)
+TEXT_CACHE_BUDGET_MB = 4  # Textos renderizados (tabla de verdad de la pantalla final)
+SCALED_CACHE_BUDGET_MB = 48  # Copias escaladas por (imagen, tamaño, filtro)
+RESIZE_SETTLE_MS = 250  # Tras este tiempo sin VIDEORESIZE se rehacen las imágenes con smoothscale
+
+# Render
+DIRTY_RECT_RENDERING = True  # En las pantallas de decisión y final, presentar solo las zonas que cambian
+ADAPTIVE_FRAME_PACING = True  # FPS solo en fundidos y animaciones, los fps del clip en video y espera de eventos en reposo
+FRAME_PACING_IDLE_MAX_MS = 500  # Espera máxima en reposo antes de volver a revisar el estado
+FRAME_PACING_POLL_MS = 50  # Espera en reposo mientras se cargan imágenes en segundo plano
+
+# Perfilador de frames (F3 muestra el overlay y lo activa aunque esté apagado aquí)
+PROFILER_ENABLED = False  # Medir cada frame desde el arranque
+PROFILER_HISTORY = 300  # Frames de la ventana móvil para FPS y percentiles
+PROFILER_OVERLAY_REFRESH_MS = 250  # Cada cuánto se vuelve a dibujar el texto del overlay
+PROFILER_TRACE_PATH = "frame_trace.json"  # Traza (formato Chrome trace) escrita al salir; relativa al directorio desde el que se lanzó el juego
+PROFILER_TRACE_MAX_EVENTS = 500_000  # Tope de eventos guardados para la traza
@@ -1,3 +1,5 @@
+# Primero el timeline de arranque, para que mida también la importación de pygame
+from scripts.utils.startup import timeline
 import pygame
 import sys
 import os
@@ -12,10 +14,12 @@ else:
 os.chdir(BASE_DIR)
 
 from scripts.game import Game
+timeline.mark("imports")
 
 def main():
     # Inicialización central de Pygame
     pygame.init()
+    timeline.mark("pygame init")
     
     # Instanciar el gestor del juego
     game = Game()
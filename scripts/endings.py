@@ -0,0 +1,155 @@
+import ast
+import functools
+import json
+import os
+
+import numpy as np
+from scripts.utils.resource_manager import BASE_DIR
+
+ENDINGS_PATH = os.path.join(BASE_DIR, "assets", "endings.json")
+
+
+class Proposition:
+    """A decision as a proposition: which GameState attribute it reads and the values for V and F."""
+
+    def __init__(self, letter, label, attribute, if_true=True, if_false=False):
+        self.letter = letter
+        self.label = label
+        self.attribute = attribute
+        self.if_true = if_true
+        self.if_false = if_false
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["letter"], data["label"], data["attribute"], data.get("true", True), data.get("false", False))
+
+    def value(self, state):
+        return getattr(state, self.attribute) == self.if_true
+
+    def apply(self, state, value):
+        setattr(state, self.attribute, self.if_true if value else self.if_false)
+
+
+def assignments(n, start=0, stop=None):
+    """
+    Rows start..stop-1 of the truth table of n propositions as a bool array of
+    shape (rows, n). Row 0 is all V, the last row all F, first column slowest.
+    """
+    stop = 1 << n if stop is None else stop
+    index = np.arange(start, stop, dtype=np.int64)
+    shifts = np.arange(n - 1, -1, -1, dtype=np.int64)
+    return ((index[:, None] >> shifts) & 1) == 0
+
+
+def compile_formula(text, letters):
+    """
+    Compiles a formula such as "S and not (Q or R)" into a function of the
+    truth-table columns (letter -> bool array). Only the propositions in
+    `letters`, and, or, not, True, False and parentheses are allowed.
+    """
+    def build(node):
+        if isinstance(node, ast.BoolOp):
+            parts = [build(value) for value in node.values]
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda columns: functools.reduce(op, (part(columns) for part in parts))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = build(node.operand)
+            return lambda columns: ~operand(columns)
+        if isinstance(node, ast.Name):
+            if node.id not in letters:
+                raise ValueError(f"Unknown proposition {node.id!r} in {text!r}")
+            return lambda columns: columns[node.id]
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            return lambda columns: np.full(len(next(iter(columns.values()))), node.value)
+        raise ValueError(f"Unsupported syntax in {text!r}: {ast.dump(node)}")
+
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid formula {text!r}: {e.msg}") from None
+    return build(tree.body)
+
+
+class EndingRules:
+    """
+    The endings as data (assets/endings.json): the propositions and one boolean
+    formula per ending. The formulas are evaluated once over every assignment
+    and compiled into a lookup table indexed by the decisions' bitmask, so
+    ending_for() is a few getattrs and one index. If formulas overlap, the
+    ending listed first wins.
+    """
+
+    def __init__(self, data):
+        self.propositions = [Proposition.from_data(p) for p in data["propositions"]]
+        self.letters = [p.letter for p in self.propositions]
+        if len(set(self.letters)) != len(self.letters):
+            raise ValueError("Proposition letters must be unique")
+        self.names = [ending["name"] for ending in data["endings"]]
+        self.formulas = [ending["when"] for ending in data["endings"]]
+        self.rules = [compile_formula(formula, self.letters) for formula in self.formulas]
+        self.matches = self.match(self.columns(assignments(len(self.letters))))
+        self.lookup = np.argmax(self.matches, axis=0).astype(np.int16)
+        self._check()
+
+    @classmethod
+    def load(cls, path=ENDINGS_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def default(cls):
+        """The rules in ENDINGS_PATH, compiled once per process."""
+        return cls.load()
+
+    def columns(self, values):
+        return {letter: values[:, i] for i, letter in enumerate(self.letters)}
+
+    def match(self, columns):
+        """Bool array (endings, rows): which formulas hold on each row."""
+        return np.stack([rule(columns) for rule in self.rules])
+
+    def evaluate(self, columns):
+        """Ending index of every row of `columns`, for tables other than the compiled one."""
+        return np.argmax(self.match(columns), axis=0).astype(np.int16)
+
+    def row_of(self, state):
+        """Bitmask of the decisions in `state`: one bit per proposition, first one highest, 0 = V."""
+        row = 0
+        for p in self.propositions:
+            row = (row << 1) | (not p.value(state))
+        return row
+
+    def ending_for(self, state):
+        return self.names[self.lookup[self.row_of(state)]]
+
+    def report(self):
+        """
+        Static check over the whole assignment space:
+          gaps: rows no formula covers.
+          overlaps: {(first, second): rows} where both formulas hold (first wins).
+          unreachable: endings that never win a row, either because their
+          formula never holds or because earlier endings shadow it.
+        """
+        rows = np.arange(self.matches.shape[1])
+        overlaps = {}
+        for i in range(len(self.names)):
+            for j in range(i + 1, len(self.names)):
+                both = rows[self.matches[i] & self.matches[j]]
+                if len(both):
+                    overlaps[(self.names[i], self.names[j])] = both.tolist()
+        won = np.bincount(self.lookup[self.matches.any(axis=0)], minlength=len(self.names))
+        return {
+            "gaps": rows[~self.matches.any(axis=0)].tolist(),
+            "overlaps": overlaps,
+            "unreachable": [name for name, count in zip(self.names, won) if count == 0],
+        }
+
+    def _check(self):
+        report = self.report()
+        if report["gaps"]:
+            raise ValueError(f"No ending covers rows {report['gaps']} of the truth table")
+        for (first, second), rows in report["overlaps"].items():
+            print(f"Endings {first!r} and {second!r} overlap on {len(rows)} rows; {first!r} wins")
+        if report["unreachable"]:
+            print(f"Endings no decision reaches: {', '.join(report['unreachable'])}")
@@ -1,15 +1,37 @@
 import pygame
 import random
+import collections
+import time
 import constantes
 import os
+import functools
 from scripts.utils.resource_manager import ResourceManager
+from scripts.utils.scene_layout import SceneLayout
+from scripts.utils.transition import FrameTransition
+from scripts.utils.profiler import profiler
+from scripts.utils.startup import timeline
 from scripts.entities.player import Player
 from scripts.game_state import GameState
-try:
-    import imageio.v2 as imageio
-except Exception:
-    imageio = None
-import numpy as np
+from scripts.scenes import SceneGraph
+from scripts.media.video_player import VideoPlayer
+from scripts.media.prefetcher import VideoPrefetcher
+from scripts.media.playback_clock import PlaybackClock
+
+
+# Estado -> layout (ver SceneLayout) que necesita para dibujarse.
+# Las escenas de decisión de assets/scenes.json usan un layout con su propio nombre.
+STATE_LAYOUTS = {
+    "menu": "menu",
+    "fading": "menu",
+    "loading": "loading",
+    "fading_to_level": "loading",
+    "playing_video": "video",
+    "fading_from_video": "video",
+    "ending_screen": "ending_screen",
+}
+
+# Pantallas estáticas (además de las escenas de decisión) que se presentan por rectángulos sucios
+STATIC_STATES = ("ending_screen",)
 
 
 class Game:
@@ -22,6 +44,7 @@ class Game:
             pygame.RESIZABLE
         )
         pygame.display.set_caption(constantes.TITULO)
+        timeline.mark("display")
 
         self.clock = pygame.time.Clock()
         self.running = True
@@ -30,8 +53,22 @@ class Game:
         self.fade_alpha = 0
         self.player = Player()
         self.game_state = GameState()
-        self.is_hover_yes = False
-        self.is_hover_no = False
+        # Escenas de decisión (assets/scenes.json) y botón bajo el mouse
+        self.scenes = SceneGraph.load()
+        self.hovered_choice = None
+
+        # ---------------- VIDEO ----------------
+        self.video_player = None
+        self.video_started = False
+        self.video_clock = PlaybackClock()
+        self.prefetcher = VideoPrefetcher()
+        self.prefetch_state = None
+        self.next_state_after_video = None
+        self.video_sequence = []
+        self.video_sequence_index = 0
+        # (clip, ms) desde start_video hasta el primer frame en pantalla
+        self.video_latencies = collections.deque(maxlen=50)
+        self.video_requested_at = None
 
         # ---------------- AUDIO ----------------
         self.music_volume = 1.0
@@ -42,52 +79,88 @@ class Game:
         self.is_winking = False
         self.next_wink_time = random.randint(500, 2000)
 
+        # ---------------- RENDER ---------------
+        # Última escena presentada por present_static_scene y sus zonas
+        self.presented_scene = None
+        self.presented_regions = {}
+        self.skipped_presents = 0
+        # Pantalla final compuesta una vez por (partida, tamaño)
+        self.ending_surface = None
+        self.ending_key = None
+        # Fotograma congelado del fundido en curso y del fundido cruzado hacia el video
+        self.transition = None
+        self.video_crossfade = None
+
         # ---------------- ASSETS ---------------
+        # True mientras la ventana se redimensiona (ver update_resize)
+        self.resize_preview = False
+        self.resize_changed_at = 0
+        self.layouts = {
+            name: SceneLayout(name, getattr(self, "layout_" + name))
+            for name in set(STATE_LAYOUTS.values())
+        }
+        for scene in self.scenes.scenes.values():
+            self.layouts[scene.name] = SceneLayout(scene.name, functools.partial(self.layout_scene, scene))
+        self.load_progress = 0
+        self.shine_offset = 0
         self.load_assets()
+        timeline.mark("menu assets")
         self.resize_elements(constantes.APP_ANCHO, constantes.APP_ALTO)
+        timeline.mark("layout")
 
         # ---------------- MUSIC ----------------
         self.play_background_music()
+        timeline.mark("music")
 
     # --------------------------------------------------
     # ASSETS
     # --------------------------------------------------
     def load_assets(self):
-        def ph(w, h, color=(200, 120, 120, 255)):
-            s = pygame.Surface((w, h), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 0))
-            pygame.draw.rect(s, color, s.get_rect(), border_radius=8)
-            return s
-
-        self.bg_orig = ResourceManager.load_image("sala_inicio", "FondoInicio_Sala.png") or ph(800, 600, (60, 60, 60, 255))
-        self.dog_orig = ResourceManager.load_image("dog", "TobyOjosAbiertos.png") or ph(300, 500, (180, 140, 90, 255))
-        self.dog_closed_orig = ResourceManager.load_image("dog_closed", "TobyOjosCerrados.png") or self.dog_orig
-        self.title_orig = ResourceManager.load_image("title", "TituloJuego.png") or ph(800, 220, (230, 200, 80, 255))
-        self.play_btn_orig = ResourceManager.load_image("play_button", "botonaJugar.png") or ph(500, 150, (90, 180, 250, 255))
-        self.play_btn_hover_orig = ResourceManager.load_image("play_button_hover", "BotosJugarMaus.png") or self.play_btn_orig
-        self.vol_on_orig = ResourceManager.load_image("vol_on", "VolumenArriba.png") or ph(256, 256, (120, 220, 120, 255))
-        self.vol_off_orig  = ResourceManager.load_image("vol_off", "Silencio.png") or ph(256, 256, (220, 120, 120, 255))
-        self.loading_bg_orig = ResourceManager.load_image("loading_bg", "FondoCarga.png") or ph(800, 600, (20, 20, 20, 255))
-        self.question_bg_orig = ResourceManager.load_image("question_bg", "ImagenFondo.png") or ph(800, 600, (30, 30, 30, 255))
-        
-        # New Backgrounds for Level 2
-        self.bg_decision_enfermo_orig = ResourceManager.load_image("decision_enfermo", "../ELEMENTOS ESCENA 2/Imagenes/ENFERMO/Decisio╠ün Toby se va con mateo.png") or ph(800, 600, (100, 50, 50, 255))
-        self.bg_decision_sano_orig = ResourceManager.load_image("decision_sano", "../ELEMENTOS ESCENA 2/Imagenes/SANO/Toby se va con mateo.png") or ph(800, 600, (50, 100, 50, 255))
-        
-        # New Background for Level 3
-        self.bg_level3_orig = ResourceManager.load_image("level3_bg", "../Nivel3/ImagenPrincipalDecisionNivel3.png") or ph(800, 600, (80, 80, 120, 255))
-
-        self.btn_yes_orig = ResourceManager.load_image("btn_yes", "BotonSi.png") or ph(300, 120, (120, 220, 120, 255))
-        self.btn_no_orig = ResourceManager.load_image("btn_no", "BotonNo.png") or ph(300, 120, (220, 120, 120, 255))
-        self.bg_level4_orig = ResourceManager.load_image("level4_bg", "../Nivel4/ImagenFondoPregunta.png") or ph(800, 600, (60, 80, 100, 255))
-        self.btn_yes_lvl4_orig = ResourceManager.load_image("btn_yes_lvl4", "../Nivel4/BotonSi.png") or self.btn_yes_orig
-        self.btn_no_lvl4_orig = ResourceManager.load_image("btn_no_lvl4", "../Nivel4/BotonNo.png") or self.btn_no_orig
-        self.bg_level5_intro_orig = ResourceManager.load_image("level5_intro_bg", "../ELEMENTOS ESCENA 5/INTRO/Toby frente al abuelo en la sala.png") or ph(800, 600, (90, 90, 110, 255))
-        self.btn_sentarse_orig = ResourceManager.load_image("btn_sentarse", "../ELEMENTOS ESCENA 5/INTRO/Botón Sentarse con él.png") or ph(300, 120, (120, 180, 240, 255))
-        self.btn_traer_orig = ResourceManager.load_image("btn_traer", "../ELEMENTOS ESCENA 5/INTRO/Boton Traer la Pelota.png") or ph(300, 120, (240, 180, 120, 255))
-        
-        self.img_derecha_orig = ResourceManager.load_image("img_derecha", "ImagenDerecha.png") or ph(400, 600, (100, 100, 100, 255))
-        self.btn_volver_orig = ResourceManager.load_image("volver_jugar", "volverJugar.png") or ph(300, 100, (100, 200, 100, 255))
+        # Solo el menú se carga de forma síncrona; las escenas siguientes se
+        # programan en el primer update(), después de presentar el menú
+        self.asset_jobs = []
+        self.asset_scene = None
+        ResourceManager.load_group(self.state)
+        ResourceManager.pin_groups([self.state])
+
+    def update_asset_groups(self):
+        # Cargar la escena actual, precargar las siguientes y liberar las inalcanzables
+        self.asset_scene = self.state
+        pending = {g for job in self.asset_jobs for g in job.groups if not ResourceManager.group_loaded(g)}
+        if not ResourceManager.group_loaded(self.state):
+            if ResourceManager.group_blocks(self.state):
+                ResourceManager.load_group(self.state)
+            elif self.state not in pending:
+                # La pantalla se dibuja sin sus imágenes (p. ej. la de carga, con un fondo liso) hasta que lleguen
+                self.asset_jobs.append(ResourceManager.load_groups_async([self.state]))
+                pending.add(self.state)
+        # Lo alcanzable y lo siguiente salen del grafo de escenas; el manifiesto solo lista imágenes
+        ResourceManager.retain_groups(self.scenes.reachable(self.state))
+        ResourceManager.pin_groups([self.state])
+        next_groups = [
+            g for g in self.scenes.next_states(self.state)
+            if ResourceManager.has_group(g) and not ResourceManager.group_loaded(g) and g not in pending
+        ]
+        if next_groups:
+            self.asset_jobs.append(ResourceManager.load_groups_async(next_groups))
+        # Las escenas se rehacen con las imágenes que acaban de quedar residentes
+        self.invalidate_layouts()
+
+    def poll_assets(self):
+        if not self.asset_jobs:
+            return
+        for job in self.asset_jobs:
+            job.poll()
+        if any(job.newly_resident for job in self.asset_jobs):
+            # Cada grupo se usa en cuanto llegan sus imágenes, sin esperar al resto del lote
+            self.invalidate_layouts()
+        self.asset_jobs = [job for job in self.asset_jobs if not job.done]
+
+    @property
+    def asset_progress(self):
+        total = sum(job.total_bytes for job in self.asset_jobs)
+        done = sum(job.done_bytes for job in self.asset_jobs)
+        return 1.0 if not self.asset_jobs else done / max(1, total)
 
     # --------------------------------------------------
     # AUDIO
@@ -113,61 +186,95 @@ class Game:
     # --------------------------------------------------
     # RESIZE
     # --------------------------------------------------
+    def scaled(self, name, size, smooth=False):
+        # Mientras se arrastra el borde de la ventana, smoothscale se sustituye por scale
+        return ResourceManager.scaled_image(name, size, smooth, preview=self.resize_preview)
+
+    def update_resize(self):
+        # Cuando el tamaño deja de cambiar, rehacer las previsualizaciones con smoothscale
+        if self.resize_preview and pygame.time.get_ticks() - self.resize_changed_at >= constantes.RESIZE_SETTLE_MS:
+            self.resize_preview = False
+            self.resize_elements(*self.screen.get_size())
+
     def resize_elements(self, width, height):
-        self.background = pygame.transform.scale(self.bg_orig, (width, height))
-        if self.loading_bg_orig:
-            self.loading_bg = pygame.transform.scale(self.loading_bg_orig, (width, height))
-        if self.question_bg_orig:
-            self.question_bg = pygame.transform.scale(self.question_bg_orig, (width, height))
-        
-        if self.bg_decision_enfermo_orig:
-            self.bg_decision_enfermo = pygame.transform.scale(self.bg_decision_enfermo_orig, (width, height))
-        if self.bg_decision_sano_orig:
-            self.bg_decision_sano = pygame.transform.scale(self.bg_decision_sano_orig, (width, height))
-        
-        if self.bg_level3_orig:
-            self.bg_level3 = pygame.transform.scale(self.bg_level3_orig, (width, height))
-        if self.bg_level4_orig:
-            self.bg_level4 = pygame.transform.scale(self.bg_level4_orig, (width, height))
-        if self.bg_level5_intro_orig:
-            self.bg_level5_intro = pygame.transform.scale(self.bg_level5_intro_orig, (width, height))
+        # Solo lo común se recalcula aquí; cada escena rehace su layout al dibujarse
+        t = time.perf_counter()
+        self.layout_common(width, height)
+        self.common_layout_ms = (time.perf_counter() - t) * 1000
+        self.invalidate_layouts()
+
+    def invalidate_layouts(self):
+        for layout in self.layouts.values():
+            layout.invalidate()
+
+    def current_layout(self):
+        name = self.state if self.state in self.scenes else STATE_LAYOUTS.get(self.state)
+        return self.layouts.get(name)
+
+    def ensure_layout(self):
+        layout = self.current_layout()
+        if layout is not None:
+            layout.ensure(self.screen.get_size(), self.resize_preview)
+
+    def layout_common(self, width, height):
+        # Volumen y área de video: se usan en todos los estados
+        vol_size = int(width * 0.10)
+        self.vol_on = self.scaled("vol_on", (vol_size, vol_size))
+        self.vol_off = self.scaled("vol_off", (vol_size, vol_size))
+        self.vol_pos = (int(width * 0.85), int(height * 0.05))
+        self.vol_rect = self.vol_on.get_rect(topleft=self.vol_pos)
+        self.vol_pos_video = (int(width * 0.03), int(height * 0.03))
+        self.vol_rect_video = self.vol_on.get_rect(topleft=self.vol_pos_video)
+
+        # Área donde se dibuja el video
+        self.video_draw_rect = pygame.Rect(0, 0, width, height)
+        if not self.resize_preview:
+            # El reproductor reabre ffmpeg en su hilo; los clips precargados se vuelven a abrir
+            if getattr(self, "video_player", None):
+                self.video_player.set_output_size(self.video_draw_rect.size)
+            self.refresh_prefetch()
+
+    def layout_menu(self, width, height):
+        self.background = self.scaled("sala_inicio", (width, height))
 
         # DOG
         dog_width = int(width * 0.3)
         dog_height = int(height * 0.5)
 
-        self.dog = pygame.transform.smoothscale(self.dog_orig, (dog_width, dog_height))
-        self.dog_closed = pygame.transform.smoothscale(self.dog_closed_orig, (dog_width, dog_height))
+        self.dog = self.scaled("dog", (dog_width, dog_height), smooth=True)
+        self.dog_closed = self.scaled("dog_closed", (dog_width, dog_height), smooth=True)
 
         self.dog_rect = self.dog.get_rect(
             center=(int(width * 0.25), int(height * 0.65))
         )
 
+        title_orig_w, title_orig_h = ResourceManager.image_size("title")
         title_w_by_width = int(width * 0.56)
-        title_h_by_width = int(self.title_orig.get_height() * (title_w_by_width / self.title_orig.get_width()))
+        title_h_by_width = int(title_orig_h * (title_w_by_width / title_orig_w))
         title_h_cap = int(height * 0.4)
         if title_h_by_width > title_h_cap:
             title_h = title_h_cap
-            title_w = int(self.title_orig.get_width() * (title_h / self.title_orig.get_height()))
+            title_w = int(title_orig_w * (title_h / title_orig_h))
         else:
             title_w = title_w_by_width
             title_h = title_h_by_width
-        self.title = pygame.transform.scale(self.title_orig, (title_w, title_h))
+        self.title = self.scaled("title", (title_w, title_h))
         title_rect = self.title.get_rect(center=(int(width * 0.62), int(height * 0.46)))
         self.title_pos = title_rect.topleft
 
         btn_w = max(int(width * 0.18), int(title_w * 0.34))
         btn_w = min(btn_w, int(width * 0.42))
-        btn_h = int(self.play_btn_orig.get_height() * (btn_w / self.play_btn_orig.get_width()))
-        self.play_btn = pygame.transform.scale(self.play_btn_orig, (btn_w, btn_h))
-        self.play_btn_hover = pygame.transform.scale(self.play_btn_hover_orig, (btn_w, btn_h))
-        
+        btn_orig_w, btn_orig_h = ResourceManager.image_size("play_button")
+        btn_h = int(btn_orig_h * (btn_w / btn_orig_w))
+        self.play_btn = self.scaled("play_button", (btn_w, btn_h))
+        self.play_btn_hover = self.scaled("play_button_hover", (btn_w, btn_h))
+
         spacing = int(height * 0.03)
         btn_centerx = title_rect.centerx
         btn_centery = title_rect.bottom + spacing + btn_h // 2
         # Subir ligeramente el botón (≈5 px)
         btn_centery -= 5
-        
+
         # Asegurar que no quede por debajo del cuello del perro
         dog_neck_y = self.dog_rect.top + int(self.dog_rect.height * 0.55)
         btn_centery = min(btn_centery, dog_neck_y)
@@ -176,14 +283,8 @@ class Game:
         self.play_btn_pos = (btn_centerx - btn_w // 2, btn_centery - btn_h // 2)
         self.play_btn_rect = self.play_btn.get_rect(topleft=self.play_btn_pos)
 
-        # VOLUME BUTTON (UNO SOLO)
-        vol_size = int(width * 0.10)
-
-        self.vol_on = pygame.transform.scale(self.vol_on_orig, (vol_size, vol_size))
-        self.vol_off = pygame.transform.scale(self.vol_off_orig, (vol_size, vol_size))
-
-        self.vol_pos = (int(width * 0.85), int(height * 0.05))
-        self.vol_rect = self.vol_on.get_rect(topleft=self.vol_pos)
+    def layout_loading(self, width, height):
+        self.loading_bg = self.scaled("loading_bg", (width, height))
         bar_w = int(width * 0.58)
         bar_h = int(height * 0.11)
         self.loading_outer_rect = pygame.Rect(0, 0, bar_w, bar_h)
@@ -195,91 +296,163 @@ class Game:
             self.loading_outer_rect.width - pad * 2,
             self.loading_outer_rect.height - pad * 2
         )
-        self.load_progress = 0
-        self.fade_surface = pygame.Surface((width, height))
-        self.fade_surface.fill((0, 0, 0))
-        self.shine_offset = 0
 
-        # Botones Sí/No
-        if self.btn_yes_orig and self.btn_no_orig:
-            btn_w = int(width * 0.30)
-            btn_h_yes = int(self.btn_yes_orig.get_height() * (btn_w / self.btn_yes_orig.get_width()))
-            btn_h_no = int(self.btn_no_orig.get_height() * (btn_w / self.btn_no_orig.get_width()))
-            self.btn_yes = pygame.transform.smoothscale(self.btn_yes_orig, (btn_w, btn_h_yes))
-            self.btn_no = pygame.transform.smoothscale(self.btn_no_orig, (btn_w, btn_h_no))
-            y = int(height * 0.80)
-            self.btn_yes_rect = self.btn_yes.get_rect(center=(int(width * 0.36), y))
-            self.btn_no_rect = self.btn_no.get_rect(center=(int(width * 0.64), y))
-        # Botones Sí/No específicos para Nivel 4
-        if self.btn_yes_lvl4_orig and self.btn_no_lvl4_orig:
-            btn_w = int(width * 0.30)
-            btn_h_yes4 = int(self.btn_yes_lvl4_orig.get_height() * (btn_w / self.btn_yes_lvl4_orig.get_width()))
-            btn_h_no4 = int(self.btn_no_lvl4_orig.get_height() * (btn_w / self.btn_no_lvl4_orig.get_width()))
-            self.btn_yes_lvl4 = pygame.transform.smoothscale(self.btn_yes_lvl4_orig, (btn_w, btn_h_yes4))
-            self.btn_no_lvl4 = pygame.transform.smoothscale(self.btn_no_lvl4_orig, (btn_w, btn_h_no4))
-            y4 = int(height * 0.80)
-            self.btn_yes_lvl4_rect = self.btn_yes_lvl4.get_rect(center=(int(width * 0.36), y4))
-            self.btn_no_lvl4_rect = self.btn_no_lvl4.get_rect(center=(int(width * 0.64), y4))
-        # Botones de Escena 5 Intro (Sentarse / Traer la pelota)
-        if self.btn_sentarse_orig and self.btn_traer_orig:
-            btn_w5 = int(width * 0.28)
-            btn_h_sent = int(self.btn_sentarse_orig.get_height() * (btn_w5 / self.btn_sentarse_orig.get_width()))
-            btn_h_traer = int(self.btn_traer_orig.get_height() * (btn_w5 / self.btn_traer_orig.get_width()))
-            self.btn_sentarse = pygame.transform.smoothscale(self.btn_sentarse_orig, (btn_w5, btn_h_sent))
-            self.btn_traer = pygame.transform.smoothscale(self.btn_traer_orig, (btn_w5, btn_h_traer))
-            y5 = int(height * 0.84)
-            self.btn_sentarse_rect = self.btn_sentarse.get_rect(center=(int(width * 0.30), y5))
-            self.btn_traer_rect = self.btn_traer.get_rect(center=(int(width * 0.70), y5))
-            
-        if getattr(self, "img_derecha_orig", None):
+    def layout_scene(self, scene, width, height):
+        # Fondo y botones de una escena de decisión; los botones mantienen su proporción
+        background = self.scaled(scene.background, (width, height)) if scene.background else None
+        buttons = []
+        for choice in scene.choices:
+            if ResourceManager.scene_image(choice.image) is None:
+                continue
+            orig_w, orig_h = ResourceManager.image_size(choice.image)
+            btn_w = int(width * choice.width)
+            btn_h = int(orig_h * (btn_w / orig_w))
+            image = self.scaled(choice.image, (btn_w, btn_h), smooth=True)
+            rect = image.get_rect(center=(int(width * choice.center[0]), int(height * choice.center[1])))
+            buttons.append((choice, image, rect))
+        return {"background": background, "buttons": buttons}
+
+    def layout_ending_screen(self, width, height):
+        self.background = self.scaled("sala_inicio", (width, height))
+        if ResourceManager.scene_image("img_derecha") is not None:
             img_h = height
-            img_w = int(self.img_derecha_orig.get_width() * (img_h / max(1, self.img_derecha_orig.get_height())))
-            self.img_derecha = pygame.transform.smoothscale(self.img_derecha_orig, (img_w, img_h))
+            orig_w, orig_h = ResourceManager.image_size("img_derecha")
+            img_w = int(orig_w * (img_h / max(1, orig_h)))
+            self.img_derecha = self.scaled("img_derecha", (img_w, img_h), smooth=True)
             self.img_derecha_rect = self.img_derecha.get_rect(topleft=(0, 0))
-            
-        if getattr(self, "btn_volver_orig", None):
+        else:
+            self.img_derecha = self.img_derecha_rect = None
+
+        if ResourceManager.scene_image("volver_jugar") is not None:
             btn_w = int(width * 0.25)
-            btn_h = int(self.btn_volver_orig.get_height() * (btn_w / max(1, self.btn_volver_orig.get_width())))
-            self.btn_volver = pygame.transform.smoothscale(self.btn_volver_orig, (btn_w, btn_h))
+            orig_w, orig_h = ResourceManager.image_size("volver_jugar")
+            btn_h = int(orig_h * (btn_w / max(1, orig_w)))
+            self.btn_volver = self.scaled("volver_jugar", (btn_w, btn_h), smooth=True)
             btn_x = int(width * 0.75)
             if getattr(self, "img_derecha_rect", None):
                 btn_x = self.img_derecha_rect.right + int((width - self.img_derecha_rect.right) * 0.5)
             self.btn_volver_rect = self.btn_volver.get_rect(center=(btn_x, int(height * 0.85)))
-            
-        # Área donde se dibuja el video
-        self.video_draw_rect = pygame.Rect(0, 0, width, height)
+        else:
+            self.btn_volver = self.btn_volver_rect = None
 
+    def layout_video(self, width, height):
         # VIDEO OVERLAY: smaller title (top-right) & volume (top-left)
         vid_title_w = int(width * 0.55)
-        vid_title_h = int(self.title_orig.get_height() * (vid_title_w / self.title_orig.get_width()))
-        self.title_video = pygame.transform.smoothscale(self.title_orig, (vid_title_w, vid_title_h))
+        title_orig_w, title_orig_h = ResourceManager.image_size("title")
+        vid_title_h = int(title_orig_h * (vid_title_w / title_orig_w))
+        self.title_video = self.scaled("title", (vid_title_w, vid_title_h), smooth=True)
         self.title_video_pos = (width - vid_title_w + int(width * 0.13), -int(vid_title_h * 0.22))
-        self.vol_pos_video = (int(width * 0.03), int(height * 0.03))
-        self.vol_rect_video = self.vol_on.get_rect(topleft=self.vol_pos_video)
 
     # --------------------------------------------------
     # MAIN LOOP
     # --------------------------------------------------
     def run(self):
+        self.present_first_frame()
         while self.running:
-            self.clock.tick(constantes.FPS)
-            self.handle_events()
-            self.update()
-            self.draw()
+            profiler.begin_frame()
+            with profiler.span("tick"):
+                fps, timeout = self.frame_pace()
+                events = self.wait_for_frame(fps, timeout)
+            with profiler.span("events"):
+                self.handle_events(events)
+            if events and self.frame_pace()[0] is not None:
+                # Un clic que arranca un fundido: la animación empieza ahora, no cuando empezó la espera
+                self.clock.tick()
+            with profiler.span("update"):
+                self.update()
+            with profiler.span("draw"):
+                self.draw()
+            profiler.end_frame(self.state)
+        self.stop_video()
+        self.prefetcher.cancel()
+        trace = profiler.dump_trace()
+        if trace:
+            print(f"Traza de frames guardada en {trace}")
+
+    def present_first_frame(self):
+        # El menú aparece antes de que empiece la carga en segundo plano
+        self.ensure_layout()
+        self.draw()
+        timeline.mark("first frame")
+        timeline.finish()
+        if constantes.STARTUP_REPORT:
+            print(timeline.report())
+
+    def frame_pace(self):
+        """
+        How the next frame is paced: (fps, None) to run at a fixed rate, or
+        (None, timeout_ms) to sleep until an event arrives or the next
+        scheduled change (a wink, the end of a black screen) is due.
+        """
+        if not constantes.ADAPTIVE_FRAME_PACING:
+            return constantes.FPS, None
+        if self.state == "playing_video" and self.video_player is not None and self.video_crossfade is None:
+            # No tiene sentido presentar más frames de los que trae el video
+            return min(constantes.FPS, max(1, round(self.video_player.fps))), None
+
+        if self.state == "menu":
+            wink_at = self.wink_duration if self.is_winking else self.next_wink_time
+            timeout = wink_at - self.wink_timer
+        elif self.state == "black_screen_wait":
+            timeout = self.wait_duration - self.wait_timer
+        elif self.is_static_screen() and self.fade_alpha == 0:
+            timeout = constantes.FRAME_PACING_IDLE_MAX_MS
+        else:
+            # Fundidos, pantalla de carga y fundido cruzado hacia el video
+            return constantes.FPS, None
+
+        # Lo que avanza sin eventos también despierta al bucle
+        timeout = min(timeout, constantes.FRAME_PACING_IDLE_MAX_MS)
+        if self.asset_jobs:
+            timeout = min(timeout, constantes.FRAME_PACING_POLL_MS)
+        if self.resize_preview:
+            timeout = min(timeout, self.resize_changed_at + constantes.RESIZE_SETTLE_MS - pygame.time.get_ticks())
+        if profiler.overlay_visible:
+            timeout = min(timeout, constantes.PROFILER_OVERLAY_REFRESH_MS)
+        return None, max(1, int(timeout))
+
+    def wait_for_frame(self, fps, timeout):
+        """Waits for the next frame; returns the event that ended an idle wait, if any."""
+        if fps is not None:
+            self.clock.tick(fps)
+            return []
+        # pygame.event.wait duerme el hilo: sin eventos el juego no usa CPU
+        event = pygame.event.wait(timeout)
+        self.clock.tick()
+        return [] if event.type == pygame.NOEVENT else [event]
 
     # --------------------------------------------------
     # EVENTS
     # --------------------------------------------------
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=()):
+        # `events`: los que ya se sacaron de la cola al despertar de una espera
+        for event in [*events, *pygame.event.get()]:
             if event.type == pygame.QUIT:
                 self.running = False
 
             elif event.type == pygame.VIDEORESIZE:
                 self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
+                self.resize_preview = True
+                self.resize_changed_at = pygame.time.get_ticks()
                 self.resize_elements(*event.size)
 
+            elif event.type == pygame.WINDOWEXPOSED:
+                # La ventana volvió a mostrarse: presentar la escena completa
+                self.presented_scene = None
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                # Overlay del perfilador (FPS, percentiles y fases del frame)
+                profiler.toggle_overlay()
+
+            elif event.type == pygame.KEYDOWN and self.state == "playing_video":
+                # Adelantar / retroceder el video con las flechas
+                if event.key == pygame.K_RIGHT:
+                    self.scrub_video(constantes.VIDEO_SCRUB_SECONDS)
+                elif event.key == pygame.K_LEFT:
+                    self.scrub_video(-constantes.VIDEO_SCRUB_SECONDS)
+
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.ensure_layout()
                 if self.state == "menu" and self.play_btn_rect.collidepoint(event.pos):
                     self.state = "fading"
                     self.fade_alpha = 0
@@ -288,71 +461,11 @@ class Game:
                         self.unmute_music()
                     else:
                         self.mute_music()
-                elif self.state == "level1":
-                    if self.btn_yes_rect and self.btn_yes_rect.collidepoint(event.pos):
-                        self.game_state.is_sick = False
-                        self.start_video("PerroentraCaja.mp4", return_state="level2_sano")
-                    elif self.btn_no_rect and self.btn_no_rect.collidepoint(event.pos):
-                        self.game_state.is_sick = True
-                        self.start_video("LluviaPerroNoEntra.mp4", return_state="level2_enfermo")
-                elif self.state == "level2_enfermo":
-                    if self.btn_yes_rect and self.btn_yes_rect.collidepoint(event.pos):
-                        # SI -> ConfioEnMateo -> Level 3
-                        self.game_state.trusts_mateo = True
-                        self.start_video("../ELEMENTOS ESCENA 2/Videos/ENFERMO/SI/ConfioEnMateo.mp4", return_state="level3")
-                    elif self.btn_no_rect and self.btn_no_rect.collidepoint(event.pos):
-                        # NO -> TOMA 2 Toby huye de mateo -> Level 3
-                        self.game_state.trusts_mateo = False
-                        self.start_video("../ELEMENTOS ESCENA 2/Videos/ENFERMO/NO/TOMA 2 Toby huye de mateo.mp4", return_state="level3")
-
-                elif self.state == "level2_sano":
-                    if self.btn_yes_rect and self.btn_yes_rect.collidepoint(event.pos):
-                        # SI -> TOMA 2 Toby se va con Mateo -> Level 3
-                        self.game_state.trusts_mateo = True
-                        self.start_video("../ELEMENTOS ESCENA 2/Videos/SANO/SI/TOMA 2 Toby se va con Mateo.mp4", return_state="level3")
-                    elif self.btn_no_rect and self.btn_no_rect.collidepoint(event.pos):
-                        # NO -> TobySeAsustahuyendo -> Level 3
-                        self.game_state.trusts_mateo = False
-                        self.start_video("../ELEMENTOS ESCENA 2/Videos/SANO/NO/TobySeAsustahuyendo.mp4", return_state="level3")
-                
-                elif self.state == "level3":
-                    if self.btn_yes_rect and self.btn_yes_rect.collidepoint(event.pos):
-                        # SI -> SiEnfrenta -> (Wait 1s) -> 2Enfrenta
-                        self.game_state.faces_fear = True
-                        self.start_video_sequence([
-                            "../Nivel3/SiEnfrenta.mp4",
-                            "WAIT:1000",
-                            "../Nivel3/2Enfrenta.mp4"
-                        ], return_state="level4")
-                    elif self.btn_no_rect and self.btn_no_rect.collidepoint(event.pos):
-                        # NO -> NoEnfrenta -> (Wait 1s) -> 2NoEnfrenta
-                        self.game_state.faces_fear = False
-                        self.start_video_sequence([
-                            "../Nivel3/NoEnfrenta.mp4",
-                            "WAIT:1000",
-                            "../Nivel3/2NoEnfrenta.mp4"
-                        ], return_state="level4")
-                
-                elif self.state == "level4":
-                    if getattr(self, "btn_no_lvl4_rect", None) and self.btn_no_lvl4_rect.collidepoint(event.pos):
-                        self.game_state.accepts_new_home = False
-                        self.start_video("../Nivel4/VideoDeNo.mp4", return_state="level5_intro")
-                    elif getattr(self, "btn_yes_lvl4_rect", None) and self.btn_yes_lvl4_rect.collidepoint(event.pos):
-                        self.game_state.accepts_new_home = True
-                        self.start_video("../Nivel4/VideoDeSi.mp4", return_state="level5_intro")
-                
-                elif self.state == "level5_intro":
-                    if getattr(self, "btn_sentarse_rect", None) and self.btn_sentarse_rect.collidepoint(event.pos):
-                        self.game_state.grandfather_interaction = "SIT"
-                        self.start_video_sequence([
-                            "../ELEMENTOS ESCENA 5/VIDEOS/Toby se sienta junto al abuelo y él lo acaricia..mp4",
-                            "WAIT:800",
-                            "../ELEMENTOS ESCENA 5/VIDEOS/(máxima aceptación)..mp4"
-                        ], return_state="ending_screen")
-                    elif getattr(self, "btn_traer_rect", None) and self.btn_traer_rect.collidepoint(event.pos):
-                        self.game_state.grandfather_interaction = "FETCH"
-                        self.start_video("../ELEMENTOS ESCENA 5/VIDEOS/Toby trae la pelota y el abuelo sonríe..mp4", return_state="ending_screen")
-                
+                elif self.state in self.scenes:
+                    choice = self.choice_at(event.pos)
+                    if choice is not None:
+                        self.choose(choice)
+
                 elif self.state == "ending_screen":
                     if getattr(self, "btn_volver_rect", None) and self.btn_volver_rect.collidepoint(event.pos):
                         self.game_state.reset()
@@ -364,10 +477,36 @@ class Game:
                     self.state = "fading_from_video"
                     self.fade_alpha = 0
                         
+    def choice_at(self, pos):
+        layout = self.current_layout()
+        if layout is None or not layout.view:
+            return None
+        for choice, image, rect in layout.view["buttons"]:
+            if rect.collidepoint(pos):
+                return choice
+        return None
+
+    def choose(self, choice):
+        # Escribir las decisiones en GameState y reproducir el video (o la secuencia) de la elección
+        for flag, value in choice.flags.items():
+            setattr(self.game_state, flag, value)
+        if choice.sequence is not None:
+            self.start_video_sequence(choice.sequence, return_state=choice.next)
+        else:
+            self.start_video(choice.video, return_state=choice.next)
+
     # --------------------------------------------------
     # UPDATE
     # --------------------------------------------------
     def update(self):
+        self.poll_assets()
+        self.update_resize()
+        if self.state != self.prefetch_state:
+            self.update_prefetch()
+        if self.state != self.asset_scene and ResourceManager.has_group(self.state):
+            self.update_asset_groups()
+        self.ensure_layout()
+
         if self.state == "menu":
             mouse_pos = pygame.mouse.get_pos()
             self.is_hovering = self.play_btn_rect.collidepoint(mouse_pos)
@@ -376,6 +515,7 @@ class Game:
             if self.fade_alpha >= 255:
                 self.state = "loading"
                 self.load_progress = 0
+        self.ensure_layout()
 
         dt = self.clock.get_time()
         self.wink_timer += dt
@@ -390,33 +530,14 @@ class Game:
                 self.wink_timer = 0
                 self.next_wink_time = random.randint(500, 2500)
         elif self.state == "loading":
-            self.load_progress = min(100, self.load_progress + 20 * dt / 1000)
+            # Progreso real: bytes de imágenes ya cargadas
+            self.load_progress = self.asset_progress * 100
             self.shine_offset = (self.shine_offset + int(140 * dt / 1000)) % (self.loading_inner_rect.width + 1)
             if self.load_progress >= 100:
                 self.state = "fading_to_level"
                 self.fade_alpha = 0
-        elif self.state == "level1":
-            mouse_pos = pygame.mouse.get_pos()
-            self.is_hover_yes = self.btn_yes_rect.collidepoint(mouse_pos) if self.btn_yes_rect else False
-            self.is_hover_no = self.btn_no_rect.collidepoint(mouse_pos) if self.btn_no_rect else False
-            if self.fade_alpha > 0:
-                self.fade_alpha = max(0, self.fade_alpha - int(800 * dt / 1000))
-        elif self.state in ("level2_sano", "level2_enfermo", "level3"):
-            mouse_pos = pygame.mouse.get_pos()
-            self.is_hover_yes = self.btn_yes_rect.collidepoint(mouse_pos) if self.btn_yes_rect else False
-            self.is_hover_no = self.btn_no_rect.collidepoint(mouse_pos) if self.btn_no_rect else False
-            if self.fade_alpha > 0:
-                self.fade_alpha = max(0, self.fade_alpha - int(800 * dt / 1000))
-        elif self.state == "level4":
-            mouse_pos = pygame.mouse.get_pos()
-            self.is_hover_yes = self.btn_yes_lvl4_rect.collidepoint(mouse_pos) if getattr(self, "btn_yes_lvl4_rect", None) else False
-            self.is_hover_no = self.btn_no_lvl4_rect.collidepoint(mouse_pos) if getattr(self, "btn_no_lvl4_rect", None) else False
-            if self.fade_alpha > 0:
-                self.fade_alpha = max(0, self.fade_alpha - int(800 * dt / 1000))
-        elif self.state == "level5_intro":
-            mouse_pos = pygame.mouse.get_pos()
-            self.is_hover_yes = self.btn_sentarse_rect.collidepoint(mouse_pos) if getattr(self, "btn_sentarse_rect", None) else False
-            self.is_hover_no = self.btn_traer_rect.collidepoint(mouse_pos) if getattr(self, "btn_traer_rect", None) else False
+        elif self.state in self.scenes:
+            self.hovered_choice = self.choice_at(pygame.mouse.get_pos())
             if self.fade_alpha > 0:
                 self.fade_alpha = max(0, self.fade_alpha - int(800 * dt / 1000))
         elif self.state == "ending_screen":
@@ -429,31 +550,38 @@ class Game:
         elif self.state == "fading_to_level":
             self.fade_alpha = min(255, self.fade_alpha + int(800 * dt / 1000))
             if self.fade_alpha >= 255:
-                self.state = "level1"
+                self.state = self.scenes.start
                 self.fade_alpha = 255
-        elif self.state == "playing_video" and getattr(self, "video_reader", None):
-            self.video_time += dt / 1000.0
-            target_index = int(self.video_time * self.video_fps)
-            if target_index != getattr(self, "video_frame_index", -1):
-                self.video_frame_index = target_index
-                if self.video_frame_index >= self.video_total_frames:
-                    self.state = "fading_from_video"
-                    self.fade_alpha = 0
-                else:
-                    try:
-                        frame = self.video_reader.get_data(self.video_frame_index)
-                        frame_surface = pygame.surfarray.make_surface(np.swapaxes(frame, 0, 1))
-                        self.video_frame_surface = frame_surface
-                        self.video_last_frame_surface = frame_surface
-                    except Exception:
-                        self.state = "fading_from_video"
-                        self.fade_alpha = 0
-            if self.video_time >= self.video_duration:
+        elif self.state == "playing_video" and getattr(self, "video_player", None) and not self.video_started:
+            # ffmpeg se abre en el hilo del reproductor; el reloj y el audio empiezan con el primer frame
+            if self.video_player.is_ready():
+                self.begin_video_playback()
+        elif self.state == "playing_video" and getattr(self, "video_player", None):
+            # El reloj sigue al audio del video; el hilo del reproductor ya decodificó los frames
+            self.video_time = self.video_clock.time()
+            self.video_player.frame_for_time(self.video_time)
+            self.video_clock.record_frame(self.video_player.current_index, self.video_player.fps, self.video_time)
+            if self.video_requested_at is not None and self.video_player.current_surface is not None:
+                latency = (time.perf_counter() - self.video_requested_at) * 1000
+                self.video_latencies.append((os.path.basename(self.video_player.path), latency))
+                self.video_requested_at = None
+            frame_surface = self.video_player.scaled_surface(self.video_draw_rect.size)
+            if frame_surface is not None:
+                self.video_frame_surface = frame_surface
+                self.video_last_frame_surface = frame_surface
+            if self.video_player.is_finished(self.video_time):
+                if self.video_player.error is not None:
+                    print(f"No se pudo reproducir el video {os.path.basename(self.video_player.path)}: {self.video_player.error}")
                 self.state = "fading_from_video"
                 self.fade_alpha = 0
+                if constantes.VIDEO_SYNC_REPORT:
+                    print(f"Sync {os.path.basename(self.video_player.path)}: {self.video_clock.drift_stats()}, dropped {self.video_player.dropped_frames}")
+                    if self.video_latencies:
+                        print(f"Latencia hasta el primer frame: {self.video_latencies[-1][1]:.1f} ms")
         elif self.state == "fading_from_video":
             self.fade_alpha = min(255, self.fade_alpha + int(1000 * dt / 1000))
             if self.fade_alpha >= 255:
+                self.stop_video()
                 if self.next_state_after_video == "NEXT_IN_SEQUENCE":
                     self.play_next_in_sequence()
                 else:
@@ -466,18 +594,20 @@ class Game:
     # DRAW
     # --------------------------------------------------
     def draw(self):
-        if self.state in ("menu", "fading"):
-            self.screen.blit(self.background, (0, 0))
-            dog_img = self.dog_closed if self.is_winking else self.dog
-            self.screen.blit(dog_img, self.dog_rect)
-            self.screen.blit(self.title, self.title_pos)
-            btn_img = self.play_btn_hover if self.is_hovering else self.play_btn
-            self.screen.blit(btn_img, self.play_btn_pos)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.state == "fading":
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
+        self.ensure_layout()
+        profiler.update_overlay(self.state, self.screen.get_size())
+        if self.is_static_screen():
+            self.present_static_scene()
+            return
+        # Las animaciones y el video se presentan completos en cada frame
+        self.presented_scene = None
+        if self.state not in ("fading", "fading_to_level", "fading_from_video"):
+            self.transition = None
+        if self.state == "menu":
+            with profiler.span("blit.menu"):
+                self.draw_menu()
+        elif self.state == "fading":
+            self.draw_fade_to_black("menu", self.draw_menu)
         elif self.state == "loading":
             bg = getattr(self, "loading_bg", None)
             if bg:
@@ -500,226 +630,256 @@ class Game:
             vol_img = self.vol_off if self.music_muted else self.vol_on
             self.screen.blit(vol_img, self.vol_rect)
         elif self.state == "fading_to_level":
-            bg = getattr(self, "loading_bg", None)
-            if bg:
-                self.screen.blit(bg, (0, 0))
-            else:
-                self.screen.fill((0, 0, 0))
-            self.fade_surface.set_alpha(self.fade_alpha)
-            self.screen.blit(self.fade_surface, (0, 0))
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-        elif self.state == "level1":
-            if getattr(self, "question_bg", None):
-                self.screen.blit(self.question_bg, (0, 0))
-            else:
-                self.screen.fill((0, 0, 0))
-            if getattr(self, "btn_yes", None):
-                self.screen.blit(self.btn_yes, self.btn_yes_rect)
-            if getattr(self, "btn_no", None):
-                self.screen.blit(self.btn_no, self.btn_no_rect)
+            self.draw_fade_to_black("loading", self.draw_loading_background)
             vol_img = self.vol_off if self.music_muted else self.vol_on
             self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
-        elif self.state == "level4":
-            if getattr(self, "bg_level4", None):
-                self.screen.blit(self.bg_level4, (0, 0))
-            else:
-                self.screen.fill((60, 80, 100))
-            if getattr(self, "btn_yes_lvl4", None):
-                self.screen.blit(self.btn_yes_lvl4, self.btn_yes_lvl4_rect)
-            if getattr(self, "btn_no_lvl4", None):
-                self.screen.blit(self.btn_no_lvl4, self.btn_no_lvl4_rect)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
-        elif self.state == "level5_intro":
-            if getattr(self, "bg_level5_intro", None):
-                self.screen.blit(self.bg_level5_intro, (0, 0))
-            else:
-                self.screen.fill((90, 90, 110))
-            if getattr(self, "btn_sentarse", None):
-                self.screen.blit(self.btn_sentarse, self.btn_sentarse_rect)
-            if getattr(self, "btn_traer", None):
-                self.screen.blit(self.btn_traer, self.btn_traer_rect)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
-        elif self.state == "level2_sano":
-            if getattr(self, "bg_decision_sano", None):
-                self.screen.blit(self.bg_decision_sano, (0, 0))
-            else:
-                self.screen.fill((50, 100, 50))
-            if getattr(self, "btn_yes", None):
-                self.screen.blit(self.btn_yes, self.btn_yes_rect)
-            if getattr(self, "btn_no", None):
-                self.screen.blit(self.btn_no, self.btn_no_rect)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
-        elif self.state == "level2_enfermo":
-            if getattr(self, "bg_decision_enfermo", None):
-                self.screen.blit(self.bg_decision_enfermo, (0, 0))
-            else:
-                self.screen.fill((100, 50, 50))
-            if getattr(self, "btn_yes", None):
-                self.screen.blit(self.btn_yes, self.btn_yes_rect)
-            if getattr(self, "btn_no", None):
-                self.screen.blit(self.btn_no, self.btn_no_rect)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
-        elif self.state == "level3":
-            if getattr(self, "bg_level3", None):
-                self.screen.blit(self.bg_level3, (0, 0))
-            else:
-                self.screen.fill((80, 80, 120))
-            if getattr(self, "btn_yes", None):
-                self.screen.blit(self.btn_yes, self.btn_yes_rect)
-            if getattr(self, "btn_no", None):
-                self.screen.blit(self.btn_no, self.btn_no_rect)
-            vol_img = self.vol_off if self.music_muted else self.vol_on
-            self.screen.blit(vol_img, self.vol_rect)
-            if self.fade_alpha > 0:
-                self.fade_surface.set_alpha(self.fade_alpha)
-                self.screen.blit(self.fade_surface, (0, 0))
         elif self.state == "black_screen_wait":
             self.screen.fill((0, 0, 0))
         elif self.state == "playing_video":
             surface = getattr(self, "video_frame_surface", None)
             if surface is not None:
-                target = pygame.transform.smoothscale(surface, (self.video_draw_rect.width, self.video_draw_rect.height))
-                self.screen.blit(target, self.video_draw_rect)
+                # El frame ya viene al tamaño de la ventana desde el decodificador
+                with profiler.span("blit.video"):
+                    self.screen.blit(surface, self.video_draw_rect)
                 # Title overlay (top-right, smaller)
                 self.screen.blit(self.title_video, self.title_video_pos)
                 # Volume button (top-left)
                 vol_img = self.vol_off if self.music_muted else self.vol_on
                 self.screen.blit(vol_img, self.vol_pos_video)
+                if self.video_crossfade is not None:
+                    # Fundido cruzado desde la pantalla de decisión, al ritmo del reloj del video
+                    remaining = 1.0 - self.video_time * 1000 / max(1, constantes.VIDEO_CROSSFADE_MS)
+                    if remaining <= 0:
+                        self.video_crossfade = None
+                    else:
+                        self.video_crossfade.draw_over(self.screen, 255 * remaining)
         elif self.state == "fading_from_video":
-            if self.video_last_frame_surface:
-                target = pygame.transform.smoothscale(self.video_last_frame_surface, (self.video_draw_rect.width, self.video_draw_rect.height))
-                self.screen.blit(target, self.video_draw_rect)
-            # Title overlay (top-right, smaller)
-            self.screen.blit(self.title_video, self.title_video_pos)
-            self.fade_surface.set_alpha(self.fade_alpha)
-            self.screen.blit(self.fade_surface, (0, 0))
+            self.draw_fade_to_black("video", self.draw_last_video_frame)
             # Volume button (top-left)
             vol_img = self.vol_off if self.music_muted else self.vol_on
             self.screen.blit(vol_img, self.vol_pos_video)
+
+        self.present()
+
+    def present(self, dirty=None):
+        # El overlay del perfilador va encima de todo, fuera de las transiciones
+        profiler.draw_overlay(self.screen)
+        with profiler.span("flip"):
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+
+    def draw_fade_to_black(self, key, draw_scene):
+        # La escena de origen se compone una vez; cada frame es un relleno y un blit con alfa
+        if self.transition is None or self.transition.key != key:
+            draw_scene()
+            self.transition = FrameTransition(self.screen, key)
+        self.transition.draw_over_black(self.screen, self.fade_alpha)
+
+    def draw_menu(self):
+        self.screen.blit(self.background, (0, 0))
+        dog_img = self.dog_closed if self.is_winking else self.dog
+        self.screen.blit(dog_img, self.dog_rect)
+        self.screen.blit(self.title, self.title_pos)
+        btn_img = self.play_btn_hover if self.is_hovering else self.play_btn
+        self.screen.blit(btn_img, self.play_btn_pos)
+        vol_img = self.vol_off if self.music_muted else self.vol_on
+        self.screen.blit(vol_img, self.vol_rect)
+
+    def draw_loading_background(self):
+        bg = getattr(self, "loading_bg", None)
+        if bg:
+            self.screen.blit(bg, (0, 0))
+        else:
+            self.screen.fill((0, 0, 0))
+
+    def draw_last_video_frame(self):
+        self.screen.fill((0, 0, 0))
+        if self.video_last_frame_surface:
+            self.screen.blit(self.video_last_frame_surface, self.video_draw_rect)
+        # Title overlay (top-right, smaller)
+        self.screen.blit(self.title_video, self.title_video_pos)
+
+    def is_static_screen(self):
+        return self.state in self.scenes or self.state in STATIC_STATES
+
+    def static_regions(self):
+        # Zonas que cambian sin cambiar de escena: nombre -> (rect, lo que se ve en ella)
+        regions = {
+            "vol": (self.vol_rect, self.music_muted),
+            "fade": (self.screen.get_rect(), self.fade_alpha),
+            "profiler": (profiler.overlay_rect, profiler.overlay_key),
+        }
+        layout = self.current_layout()
+        if self.state in self.scenes and layout.view:
+            for choice, image, rect in layout.view["buttons"]:
+                regions["button:" + choice.id] = (rect, self.hovered_choice is choice)
+        return regions
+
+    def present_static_scene(self):
+        """
+        Draws a decision or ending screen, presenting only the regions that changed.
+        Frames where nothing changed are neither drawn nor presented.
+        """
+        regions = self.static_regions()
+        layout = self.current_layout()
+        scene = (self.state, self.screen.get_size(), layout.built_for, layout.builds)
+        if self.fade_alpha > 0:
+            # Fundido de entrada desde negro: la escena se compone una sola vez
+            key = ("fade_in", scene)
+            if self.transition is None or self.transition.key != key:
+                self.draw_static_scene()
+                self.transition = FrameTransition(self.screen, key)
+            self.transition.draw_over_black(self.screen, self.fade_alpha)
+            self.present()
+        elif not constantes.DIRTY_RECT_RENDERING or scene != self.presented_scene:
+            self.transition = None
+            with profiler.span("blit.scene"):
+                self.draw_static_scene()
+            self.present()
+        else:
+            dirty = [rect for name, (rect, value) in regions.items() if self.presented_regions.get(name) != (rect, value)]
+            if not dirty:
+                self.skipped_presents += 1
+                return
+            with profiler.span("blit.scene"):
+                for rect in dirty:
+                    # Recomponer la escena solo dentro del rectángulo sucio
+                    self.screen.set_clip(rect)
+                    self.draw_static_scene()
+                self.screen.set_clip(None)
+            self.present(dirty)
+        self.presented_scene = scene
+        self.presented_regions = regions
+
+    def draw_static_scene(self):
+        scene = self.scenes.get(self.state)
+        if scene is not None:
+            view = self.current_layout().view
+            if view["background"]:
+                self.screen.blit(view["background"], (0, 0))
+            else:
+                self.screen.fill(scene.fill)
+            for choice, image, rect in view["buttons"]:
+                self.screen.blit(image, rect)
+            vol_img = self.vol_off if self.music_muted else self.vol_on
+            self.screen.blit(vol_img, self.vol_rect)
         elif self.state == "ending_screen":
             self.draw_ending_screen()
 
-        pygame.display.flip()
-
     def draw_ending_screen(self):
+        # La composición solo cambia con la partida o con el layout (tamaño de ventana)
+        layout = self.layouts["ending_screen"]
+        key = (self.game_state.as_tuple(), self.screen.get_size(), layout.built_for, layout.builds)
+        if key != self.ending_key:
+            self.ending_surface = self.compose_ending_screen(*self.screen.get_size())
+            self.ending_key = key
+        self.screen.blit(self.ending_surface, (0, 0))
+        vol_img = self.vol_off if self.music_muted else self.vol_on
+        self.screen.blit(vol_img, self.vol_rect)
+
+    def compose_ending_screen(self, width, height):
+        surface = pygame.Surface((width, height)).convert()
         if getattr(self, "background", None):
-            self.screen.blit(self.background, (0, 0))
-            overlay = pygame.Surface((self.screen.get_width(), self.screen.get_height()), pygame.SRCALPHA)
+            surface.blit(self.background, (0, 0))
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 170))
-            self.screen.blit(overlay, (0, 0))
+            surface.blit(overlay, (0, 0))
         else:
-            self.screen.fill((40, 40, 50))
-            
+            surface.fill((40, 40, 50))
+
         if getattr(self, "img_derecha", None):
-            self.screen.blit(self.img_derecha, self.img_derecha_rect)
-            
+            surface.blit(self.img_derecha, self.img_derecha_rect)
+
         try:
-            pygame.font.init()
-            font_title = pygame.font.SysFont("Arial", int(self.screen.get_height() * 0.045), bold=True)
-            font_text = pygame.font.SysFont("Arial", int(self.screen.get_height() * 0.035))
-            
-            text_x = int(self.screen.get_width() * 0.52)
+            title_size = int(height * 0.045)
+            text_size = int(height * 0.035)
+
+            def text(value, color, size=text_size, bold=False):
+                return ResourceManager.render_text(value, "Arial", size, color, bold=bold)
+
+            text_x = int(width * 0.52)
             if getattr(self, "img_derecha_rect", None):
-                text_x = max(text_x, self.img_derecha_rect.right + int(self.screen.get_width() * 0.03))
-            
-            title_surf = font_title.render("Tabla de Verdad", True, (255, 255, 255))
-            self.screen.blit(title_surf, (text_x, int(self.screen.get_height() * 0.1)))
-            
+                text_x = max(text_x, self.img_derecha_rect.right + int(width * 0.03))
+
+            surface.blit(text("Tabla de Verdad", (255, 255, 255), title_size, bold=True), (text_x, int(height * 0.1)))
+
+            # La tabla de verdad (y NumPy) se importa con la primera pantalla final
+            from scripts.truth_table import TruthTable
+
             state = self.game_state
-            
-            p_val = "F" if state.is_sick else "V"
-            q_val = "V" if state.trusts_mateo else "F"
-            r_val = "V" if state.faces_fear else "F"
-            s_val = "V" if state.accepts_new_home else "F"
-            t_val = "V" if state.grandfather_interaction == "SIT" else "F"
-            
+            table = TruthTable.default()
+
             decisions = [
-                ("P (Sano)", p_val),
-                ("Q (Confía en Mateo)", q_val),
-                ("R (Enfrenta Miedo)", r_val),
-                ("S (Acepta Hogar)", s_val),
-                ("T (Sentarse con Abuelo)", t_val)
+                (f"{p.letter} ({p.label})", "V" if p.value(state) else "F")
+                for p in table.propositions
             ]
-            
-            start_y = int(self.screen.get_height() * 0.22)
-            line_spacing = int(self.screen.get_height() * 0.07)
-            
-            header_surf = font_text.render("Proposición                             Lógica", True, (200, 200, 200))
-            self.screen.blit(header_surf, (text_x, start_y - line_spacing))
-            
+
+            start_y = int(height * 0.22)
+            line_spacing = int(height * 0.07)
+
+            surface.blit(text("Proposición                             Lógica", (200, 200, 200)), (text_x, start_y - line_spacing))
+
             for i, (desc, val) in enumerate(decisions):
-                desc_surf = font_text.render(desc, True, (200, 200, 200))
-                val_surf = font_text.render(val, True, (255, 215, 0))
-                self.screen.blit(desc_surf, (text_x, start_y + i * line_spacing))
-                self.screen.blit(val_surf, (text_x + int(self.screen.get_width() * 0.35), start_y + i * line_spacing))
-                
-            logic_expr = f"Expresión: P({p_val}) ^ Q({q_val}) ^ R({r_val}) ^ S({s_val}) ^ T({t_val})"
-            logic_surf = font_text.render(logic_expr, True, (150, 200, 255))
-            self.screen.blit(logic_surf, (text_x, start_y + len(decisions) * line_spacing))
+                surface.blit(text(desc, (200, 200, 200)), (text_x, start_y + i * line_spacing))
+                surface.blit(text(val, (255, 215, 0)), (text_x + int(width * 0.35), start_y + i * line_spacing))
+
+            logic_expr = "Expresión: " + " ^ ".join(f"{p.letter}({val})" for p, (_, val) in zip(table.propositions, decisions))
+            surface.blit(text(logic_expr, (150, 200, 255)), (text_x, start_y + len(decisions) * line_spacing))
 
             ending_result = state.calculate_ending()
-            ending_surf = font_title.render(f"Resultado: {ending_result}", True, (100, 255, 100))
-            self.screen.blit(ending_surf, (text_x, start_y + len(decisions) * line_spacing + line_spacing))
+            ending_surf = text(f"Resultado: {ending_result}", (100, 255, 100), title_size, bold=True)
+            surface.blit(ending_surf, (text_x, start_y + len(decisions) * line_spacing + line_spacing))
+
+            # Cuántas de todas las combinaciones posibles llevan a este mismo final
+            rows = table.distribution().get(ending_result, 0)
+            coverage = f"{rows} de {len(table)} combinaciones ({100 * rows / len(table):.1f}%) llevan a este final"
+            surface.blit(text(coverage, (200, 200, 200)), (text_x, start_y + len(decisions) * line_spacing + 2 * line_spacing))
         except Exception as e:
             pass
-            
+
         if getattr(self, "btn_volver", None):
-            self.screen.blit(self.btn_volver, self.btn_volver_rect)
-        vol_img = self.vol_off if self.music_muted else self.vol_on
-        self.screen.blit(vol_img, self.vol_rect)
-        if self.fade_alpha > 0:
-            self.fade_surface.set_alpha(self.fade_alpha)
-            self.screen.blit(self.fade_surface, (0, 0))
+            surface.blit(self.btn_volver, self.btn_volver_rect)
+        return surface
 
-    def start_video(self, filename, return_state="menu"):
+    def video_path(self, filename):
         base_path = os.path.dirname(os.path.abspath(__file__))
-        video_path = os.path.join(base_path, "..", "assets", "images", filename)
-        if not imageio:
-            print("ImageIO no está disponible.")
+        return os.path.normpath(os.path.join(base_path, "..", "assets", "images", filename))
+
+    def update_prefetch(self):
+        # Al entrar a una pantalla de decisión se precargan los dos videos posibles
+        self.prefetch_state = self.state
+        scene = self.scenes.get(self.state)
+        if scene is None:
+            # Durante una secuencia el siguiente clip se está precargando; no cancelarlo
+            if self.state not in ("playing_video", "fading_from_video", "black_screen_wait"):
+                self.prefetcher.cancel()
             return
+        paths = [self.video_path(choice.clips()[0]) for choice in scene.choices if choice.clips()]
+        self.prefetcher.prefetch(paths, self.video_draw_rect.size)
+
+    def refresh_prefetch(self):
+        # Los clips precargados se abrieron al tamaño anterior de la ventana: se reabren al nuevo
+        if self.state in self.scenes:
+            self.update_prefetch()
+        elif self.state == "black_screen_wait" or self.next_state_after_video == "NEXT_IN_SEQUENCE":
+            self.prefetch_next_in_sequence()
+
+    def start_video(self, filename, return_state="menu"):
+        video_path = self.video_path(filename)
+        self.video_requested_at = time.perf_counter()
         try:
-            reader = imageio.get_reader(video_path)
-            meta = reader.get_meta_data()
-            self.video_reader = reader
-            self.video_fps = int(meta.get("fps", 24))
-            self.video_duration = float(meta.get("duration", 0)) or 0.0
-            self.video_total_frames = max(1, int(self.video_duration * max(1, self.video_fps)))
+            self.stop_video()
+            self.video_crossfade = self.capture_video_crossfade()
+            self.video_player = self.open_video(video_path)
             self.video_time = 0.0
-            self.video_frame_index = -1
+            self.video_has_audio = False
+            self.video_started = False
             self.video_frame_surface = None
             self.next_state_after_video = return_state
             self.state = "playing_video"
-            
-            # Stop background music to play video audio properly (if available)
-            pygame.mixer.music.stop()
-            try:
-                mp3_path = os.path.splitext(video_path)[0] + ".mp3"
-                if os.path.exists(mp3_path):
-                    pygame.mixer.music.load(mp3_path)
-                    pygame.mixer.music.set_volume(self.music_volume if not self.music_muted else 0)
-                    pygame.mixer.music.play()
-            except Exception:
-                pass
+            # El audio del video (si lo hay) arranca con el primer frame, en begin_video_playback
             
             # Switch to rain sound during video (Only if needed, but requested behavior is video audio)
             # The previous code was forcing 'Rain Sound.mp3'. 
@@ -746,7 +906,66 @@ class Game:
             
         except Exception as e:
             print(f"No se pudo cargar el video {filename}: {e}")
-            self.state = self.next_state_after_video or "menu"
+            self.video_requested_at = None
+            if return_state == "NEXT_IN_SEQUENCE":
+                # Saltar el clip que falta y seguir con la secuencia
+                self.play_next_in_sequence()
+            else:
+                self.state = return_state or "menu"
+
+    def capture_video_crossfade(self):
+        # Desde una pantalla de decisión, el primer frame del video entra con un fundido cruzado
+        if self.is_static_screen() and constantes.VIDEO_CROSSFADE_MS > 0:
+            return FrameTransition(self.screen)
+        return None
+
+    def open_video(self, video_path):
+        # El reproductor precargado (si lo hay) ya tiene frames decodificados
+        # Tanto el precargado como uno nuevo abren ffmpeg en su hilo: aquí no se espera
+        player = self.prefetcher.take(video_path, self.video_draw_rect.size)
+        if player is None:
+            player = VideoPlayer(video_path, output_size=self.video_draw_rect.size).start()
+        return player
+
+    def begin_video_playback(self):
+        # Stop background music to play video audio properly (if available)
+        player = self.video_player
+        self.video_has_audio = player.error is None and self.play_video_audio(player.path)
+        self.video_clock.reset(0.0, audio=self.video_has_audio)
+        self.video_started = True
+
+    def play_video_audio(self, video_path):
+        # La pista de audio del clip es un .mp3 con el mismo nombre; devuelve si se está reproduciendo
+        pygame.mixer.music.stop()
+        try:
+            mp3_path = os.path.splitext(video_path)[0] + ".mp3"
+            if os.path.exists(mp3_path):
+                pygame.mixer.music.load(mp3_path)
+                pygame.mixer.music.set_volume(self.music_volume if not self.music_muted else 0)
+                pygame.mixer.music.play()
+                return True
+        except Exception:
+            pass
+        return False
+
+    def scrub_video(self, offset):
+        if not getattr(self, "video_player", None) or not self.video_started:
+            return
+        self.video_time = self.video_player.seek(self.video_time + offset)
+        audio = self.video_has_audio
+        if audio:
+            try:
+                pygame.mixer.music.play(start=self.video_time)
+            except pygame.error:
+                audio = False
+        self.video_clock.reset(self.video_time, audio=audio)
+
+    def stop_video(self):
+        player = getattr(self, "video_player", None)
+        if player:
+            player.close()
+            self.video_player = None
+        self.video_crossfade = None
 
     def start_video_sequence(self, sequence, return_state="menu"):
         self.video_sequence = sequence
@@ -775,9 +994,16 @@ class Game:
             # If it's a video, we set 'next_state_after_video' to trigger this method again
             # We need a special handling in update loop for 'fading_from_video' -> calls play_next_in_sequence
             self.start_video(item, return_state="NEXT_IN_SEQUENCE")
+        self.prefetch_next_in_sequence()
+
+    def prefetch_next_in_sequence(self):
+        # Abrir y decodificar el siguiente clip mientras el actual (o la espera) sigue en pantalla
+        for item in self.video_sequence[self.video_sequence_index:]:
+            if not item.startswith("WAIT:"):
+                self.prefetcher.prefetch([self.video_path(item)], self.video_draw_rect.size)
+                return
 
     # Override return state logic in update
     # We need to change line 314 logic to support sequence
     # But since I can't easily change just that line without context, I will rely on 'NEXT_IN_SEQUENCE' check
     # Let's modify the 'fading_from_video' block logic instead with a small trick or just search/replace it.
-
@@ -13,23 +13,14 @@ class GameState:
         self.faces_fear = False
         self.accepts_new_home = False
         self.grandfather_interaction = None
+
+    def as_tuple(self):
+        """The decisions taken so far, hashable (e.g. as a cache key)."""
+        return (self.is_sick, self.trusts_mateo, self.faces_fear, self.accepts_new_home, self.grandfather_interaction)
         
     def calculate_ending(self):
-        """Returns a string identifier for the calculated ending."""
-        score = 0
-        if self.trusts_mateo: score += 1
-        if self.faces_fear: score += 1
-        if self.accepts_new_home: score += 1
-        
-        if score == 0:
-            return "El Lobo Solitario"
-        elif score == 3 and not self.is_sick:
-            return "El Mejor Chico"
-        elif score == 3 and self.is_sick:
-            return "Corazón Sanando"
-        elif self.accepts_new_home and not self.faces_fear:
-            return "Tímido pero a Salvo"
-        elif self.accepts_new_home and not self.trusts_mateo:
-            return "Guardián Independiente"
-        else:
-            return "Adaptación Neutral"
+        """Returns a string identifier for the calculated ending (see assets/endings.json)."""
+        # Las reglas (y NumPy) se cargan con el primer final, no al arrancar
+        from scripts.endings import EndingRules
+
+        return EndingRules.default().ending_for(self)
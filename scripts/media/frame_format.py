@@ -0,0 +1,23 @@
+import sys
+import pygame
+
+# ffmpeg writes frames with the same byte layout as a 32-bit XRGB surface,
+# so uploading a frame is a single memcpy into a preallocated surface.
+FRAME_MASKS = (0xFF0000, 0x00FF00, 0x0000FF, 0)
+FRAME_PIX_FMT = "bgr0" if sys.byteorder == "little" else "0rgb"
+FRAME_BPP = 4
+# El mismo orden de bytes como formato de pygame.image.tobytes/frombuffer
+FRAME_TOBYTES_FORMAT = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+
+def frame_bytes(size):
+    return size[0] * size[1] * FRAME_BPP
+
+
+def make_frame_surface(size):
+    return pygame.Surface(size, 0, 32, FRAME_MASKS)
+
+
+def upload_frame(surface, raw):
+    """Copies a raw ffmpeg frame into `surface` in place, without allocating a new Surface."""
+    surface.get_buffer().write(raw, 0)
@@ -0,0 +1,71 @@
+import collections
+import time
+import pygame
+from scripts.utils.stats import percentile
+
+
+class PlaybackClock:
+    """
+    Presentation clock for a video clip.
+
+    When the clip's companion track is playing through pygame.mixer.music the
+    clock follows the mixer position, interpolated with wall time between the
+    mixer's coarse updates; otherwise it runs on wall time. A hitch in the main
+    loop therefore makes the video drop frames to catch up instead of drifting.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, position=0.0, audio=False):
+        """Restarts the clock at `position` seconds. Call right after music.play(start=position)."""
+        self.audio = audio
+        self._offset = position
+        self._anchor_time = position
+        self._anchor_wall = time.perf_counter()
+        self._last_pos_ms = None
+        self._last_time = position
+        self._last_index = None
+        self._repeated_index = None
+        self.repeated_frames = 0
+        self.drift_samples = collections.deque(maxlen=1000)
+
+    def time(self):
+        now = time.perf_counter()
+        if self.audio:
+            pos = pygame.mixer.music.get_pos()
+            if pos >= 0 and pos != self._last_pos_ms:
+                # get_pos counts from the last play() call, which started at `_offset`
+                self._last_pos_ms = pos
+                self._anchor_time = self._offset + pos / 1000.0
+                self._anchor_wall = now
+        # Never run backwards when a new mixer reading lands behind the interpolation
+        self._last_time = max(self._last_time, self._anchor_time + (now - self._anchor_wall))
+        return self._last_time
+
+    def record_frame(self, index, fps, clock_time):
+        """Records the frame presented at `clock_time` for the drift statistics."""
+        if index < 0:
+            return
+        frame_time = index / fps
+        self.drift_samples.append(frame_time - clock_time)
+        # The same frame still on screen after its slot has passed is a repeat,
+        # counted once per frame however many updates it stays overdue
+        if index == self._last_index and index != self._repeated_index and clock_time >= frame_time + 1.0 / fps:
+            self.repeated_frames += 1
+            self._repeated_index = index
+        self._last_index = index
+
+    def drift_stats(self):
+        """Drift between the presented frame and the clock, in ms (negative means the picture is behind)."""
+        if not self.drift_samples:
+            return {"samples": 0, "mean_ms": 0.0, "p95_abs_ms": 0.0, "max_abs_ms": 0.0, "repeated_frames": self.repeated_frames}
+        drifts = [d * 1000 for d in self.drift_samples]
+        abs_drifts = [abs(d) for d in drifts]
+        return {
+            "samples": len(drifts),
+            "mean_ms": sum(drifts) / len(drifts),
+            "p95_abs_ms": percentile(abs_drifts, 0.95),
+            "max_abs_ms": max(abs_drifts),
+            "repeated_frames": self.repeated_frames,
+        }
@@ -0,0 +1,41 @@
+from scripts.media.video_player import VideoPlayer
+
+
+class VideoPrefetcher:
+    """
+    Opens candidate clips in the background while a decision screen is shown.
+    Each player opens ffmpeg and decodes its first frames into its ring buffer on
+    its own worker thread, so neither prefetching nor taking a player blocks the
+    main loop. The clip that is chosen is handed over warm (or still opening) and
+    the others are closed. Players are kept per (path, output size): after a
+    resize, a clip opened at the old size is never handed out.
+    """
+
+    def __init__(self):
+        self._players = {}
+
+    def prefetch(self, paths, output_size):
+        """Starts opening every path in `paths` that is not already prefetched at `output_size`."""
+        output_size = tuple(output_size)
+        for path in paths:
+            if (path, output_size) in self._players:
+                continue
+            # El mismo clip precargado a otro tamaño ya no se va a usar
+            for key in [key for key in self._players if key[0] == path]:
+                self._players.pop(key).close()
+            try:
+                self._players[(path, output_size)] = VideoPlayer(path, output_size=output_size).start()
+            except Exception as e:
+                print(f"No se pudo precargar el video {path}: {e}")
+
+    def take(self, path, output_size):
+        """Returns the player prefetched for `path` at `output_size` (or None) and drops every other clip."""
+        player = self._players.pop((path, tuple(output_size)), None)
+        self.cancel()
+        return player
+
+    def cancel(self):
+        players = list(self._players.values())
+        self._players.clear()
+        for player in players:
+            player.close()
@@ -0,0 +1,208 @@
+"""
+Pre-transcoded video cache.
+
+Each clip is stored once per target size as a JPEG frame pack: every frame
+already scaled to the target size and JPEG-encoded, concatenated in one
+.frames file, with the offset of each frame in a small JSON index. Playing a
+cached clip is a sequential read plus one JPEG decode per frame on the player's
+worker thread (about 9 ms at 800x600), with no H.264 decoding or scaling. A
+cache entry is only used when its source is unchanged: same mtime or, after a
+copy or checkout that only changed the mtime, same size and content hash (the
+entry is then re-stamped). Otherwise the mp4 is decoded.
+
+Build the cache (from the project root) for the window sizes you ship:
+
+    python -m scripts.media.video_cache --size 800x600 [clip.mp4 ...]
+
+Disk budget: a frame takes about VIDEO_CACHE_JPEG_BYTES_PER_PIXEL bytes per
+pixel (~70 KB at 800x600, ~1.7 MB/s at 24 fps; raw frames would be 1.9 MB
+each). Clips whose cache entry would exceed VIDEO_CACHE_MAX_CLIP_MB are refused
+and keep playing from the mp4.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import pygame
+import constantes
+from scripts.utils.atlas import content_hash
+from scripts.utils.resource_manager import BASE_DIR
+from scripts.media.frame_format import FRAME_BPP, FRAME_PIX_FMT, FRAME_TOBYTES_FORMAT
+
+CACHE_FORMAT = "jpeg-pack"
+
+CACHE_DIR = os.path.join(BASE_DIR, "assets", "video_cache")
+
+
+def _entry_path(source, size):
+    source = os.path.normpath(os.path.abspath(source))
+    rel = os.path.relpath(source, BASE_DIR)
+    digest = hashlib.sha1(rel.encode("utf-8")).hexdigest()[:10]
+    stem = os.path.splitext(os.path.basename(source))[0].strip(". ").replace(" ", "_")
+    return os.path.join(CACHE_DIR, f"{stem}-{digest}.{size[0]}x{size[1]}")
+
+
+def find_entry(source, size):
+    """Returns the index of a fresh cache entry for `source` at `size`, or None."""
+    if not size:
+        return None
+    base = _entry_path(source, size)
+    try:
+        with open(base + ".json", encoding="utf-8") as f:
+            index = json.load(f)
+        stat = os.stat(source)
+    except (OSError, ValueError):
+        return None
+    if tuple(index.get("size", ())) != tuple(size):
+        return None
+    if index.get("format") != CACHE_FORMAT or not os.path.exists(base + ".frames"):
+        return None
+    if index.get("source_mtime") != stat.st_mtime and not _restamp(base, index, source, stat):
+        return None
+    index["frames_path"] = base + ".frames"
+    return index
+
+
+def _restamp(base, index, source, stat):
+    """
+    Accepts an entry whose source only changed mtime (a copied tree, a git
+    checkout, a PyInstaller extraction) if its size and content hash match, and
+    records the new mtime so the next lookup is a plain stat again.
+    """
+    if index.get("source_bytes") != stat.st_size:
+        return False
+    try:
+        if content_hash(source) != index.get("source_hash"):
+            return False
+    except OSError:
+        return False
+    index["source_mtime"] = stat.st_mtime
+    try:
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(index, f)
+    except OSError:
+        # Caché de solo lectura: se vuelve a comprobar el hash en cada apertura
+        pass
+    return True
+
+
+def open_stream(source, size, start_time=0.0):
+    """Opens a cached clip with the same shape as imageio_ffmpeg.read_frames: metadata first, then raw frames."""
+    index = find_entry(source, size)
+    if index is None:
+        return None
+    return _read_frames(index, int(start_time * index["fps"]))
+
+
+def _read_frames(index, start_index):
+    size = tuple(index["size"])
+    yield {"fps": index["fps"], "duration": index["duration"], "size": size, "source_size": tuple(index["source_size"])}
+    offsets = index["offsets"]
+    with open(index["frames_path"], "rb") as f:
+        f.seek(offsets[min(start_index, len(offsets) - 1)])
+        for i in range(start_index, len(offsets) - 1):
+            data = f.read(offsets[i + 1] - offsets[i])
+            # Se decodifica en el hilo del reproductor, al mismo formato que entrega ffmpeg
+            frame = pygame.image.load(io.BytesIO(data), "frame.jpg")
+            yield pygame.image.tobytes(frame, FRAME_TOBYTES_FORMAT)
+
+
+def estimated_bytes(duration, fps, size):
+    """Estimated size of a cache entry, from VIDEO_CACHE_JPEG_BYTES_PER_PIXEL."""
+    return int(duration * fps * size[0] * size[1] * constantes.VIDEO_CACHE_JPEG_BYTES_PER_PIXEL)
+
+
+class CacheTooLarge(ValueError):
+    pass
+
+
+def build_entry(source, size):
+    """
+    Transcodes `source` to a JPEG frame pack at `size`. Returns the number of
+    bytes written. Raises CacheTooLarge (and writes nothing) if the entry is
+    estimated, or turns out while writing, to exceed VIDEO_CACHE_MAX_CLIP_MB.
+    """
+    import imageio_ffmpeg
+
+    limit = constantes.VIDEO_CACHE_MAX_CLIP_MB * 1024 * 1024
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    base = _entry_path(source, size)
+    stat = os.stat(source)
+    stream = imageio_ffmpeg.read_frames(source, pix_fmt=FRAME_PIX_FMT, bpp=FRAME_BPP, output_params=["-s", "%dx%d" % size])
+    meta = next(stream)
+    fps = float(meta.get("fps", 24)) or 24.0
+    duration = float(meta.get("duration", 0)) or 0.0
+    estimate = estimated_bytes(duration, fps, size)
+    if estimate > limit:
+        stream.close()
+        raise CacheTooLarge(f"estimated {estimate / (1024 * 1024):.0f} MB, limit {constantes.VIDEO_CACHE_MAX_CLIP_MB} MB")
+    offsets = [0]
+    # Write under a temporary name so a half-built entry is never picked up
+    try:
+        with open(base + ".frames.tmp", "wb") as f:
+            for raw in stream:
+                buffer = io.BytesIO()
+                pygame.image.save(pygame.image.frombuffer(raw, size, FRAME_TOBYTES_FORMAT), buffer, "frame.jpg")
+                f.write(buffer.getvalue())
+                offsets.append(f.tell())
+                if offsets[-1] > limit:
+                    raise CacheTooLarge(f"over {constantes.VIDEO_CACHE_MAX_CLIP_MB} MB after {len(offsets) - 1} frames")
+    except BaseException:
+        stream.close()
+        os.remove(base + ".frames.tmp")
+        raise
+    os.replace(base + ".frames.tmp", base + ".frames")
+    index = {
+        "source": os.path.relpath(os.path.abspath(source), BASE_DIR),
+        "source_mtime": stat.st_mtime,
+        "source_bytes": stat.st_size,
+        "source_hash": content_hash(source),
+        "source_size": list(meta["source_size"]),
+        "size": list(size),
+        "format": CACHE_FORMAT,
+        "fps": fps,
+        "duration": duration,
+        "frames": len(offsets) - 1,
+        "offsets": offsets,
+    }
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    return offsets[-1]
+
+
+def _find_clips():
+    clips = []
+    for root, _, files in os.walk(os.path.join(BASE_DIR, "assets")):
+        if os.path.abspath(root).startswith(CACHE_DIR):
+            continue
+        clips.extend(os.path.join(root, name) for name in files if name.lower().endswith(".mp4"))
+    return sorted(clips)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the pre-transcoded video cache.")
+    parser.add_argument("--size", action="append", required=True, help="Target size, e.g. 800x600. Can be repeated.")
+    parser.add_argument("--force", action="store_true", help="Rebuild entries that are still fresh.")
+    parser.add_argument("clips", nargs="*", help="Clips to cache (default: every mp4 under assets/).")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.size]
+    total = 0
+    for clip in args.clips or _find_clips():
+        for size in sizes:
+            if not args.force and find_entry(clip, size):
+                print(f"fresh   {size[0]}x{size[1]}  {os.path.relpath(clip, BASE_DIR)}")
+                continue
+            try:
+                written = build_entry(clip, size)
+            except CacheTooLarge as e:
+                print(f"skipped {size[0]}x{size[1]}  {os.path.relpath(clip, BASE_DIR)}  ({e}; plays from the mp4)")
+                continue
+            total += written
+            print(f"built   {size[0]}x{size[1]}  {os.path.relpath(clip, BASE_DIR)}  ({written / (1024 * 1024):.0f} MB)")
+    print(f"{total / (1024 * 1024):.0f} MB written to {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
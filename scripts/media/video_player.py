@@ -0,0 +1,248 @@
+import collections
+import logging
+import os
+import threading
+import pygame
+import constantes
+from scripts.media import video_cache
+from scripts.media.frame_format import FRAME_BPP, FRAME_PIX_FMT, make_frame_surface, upload_frame
+from scripts.utils.profiler import profiler
+
+# ffmpeg warns whenever the output size differs from the source, which is on purpose here
+logging.getLogger("imageio_ffmpeg").setLevel(logging.ERROR)
+
+
+class VideoPlayer:
+    """
+    Streams a video on a worker thread into a bounded ring buffer of raw frames.
+    The main loop only picks the frame matching the current playback time and
+    uploads it into one preallocated surface per video.
+
+    Frames are read with ffmpeg's forward iterator; frames that are already late
+    are discarded as raw bytes, and ffmpeg is only restarted when `seek` is called
+    or the output size changes. ffmpeg is always opened on the worker thread:
+    `start()` returns at once and `is_ready()` tells when the first frame is in;
+    on a restart the main loop keeps presenting the current frame until the new
+    ones arrive. When `output_size` is given, ffmpeg scales the frames itself so
+    they can be blitted without a per-draw smoothscale.
+
+    fps, duration and frame_size come from the clip's metadata once the worker
+    has read it; until then fps is a 24 fps placeholder and duration is 0.
+    """
+
+    def __init__(self, path, output_size=None, buffer_size=constantes.VIDEO_BUFFER_SIZE):
+        # Un clip que no existe falla aquí, como antes de abrir ffmpeg en el hilo
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.output_size = tuple(output_size) if output_size else None
+        self.buffer_size = max(1, buffer_size)
+
+        self.dropped_frames = 0
+        self.current_index = -1
+        self.current_surface = None
+        self.error = None
+        self.from_cache = False
+        self._surface = None
+        self._scaled_key = None
+        self._scaled_surface = None
+
+        self._buffer = collections.deque()
+        self._cond = threading.Condition()
+        self._wanted_index = 0
+        self._decoder_done = False
+        self._generation = 0
+        self._thread = None
+        # Solo un hilo abre ffmpeg a la vez (ver _decode_loop)
+        self._open_lock = threading.Lock()
+
+        # Se rellenan con los metadatos del clip cuando el hilo abre ffmpeg
+        self.has_metadata = False
+        self.fps = 24.0
+        self.duration = 0.0
+        self.total_frames = 0
+        self.frame_size = None
+
+    # --------------------------------------------------
+    # WORKER
+    # --------------------------------------------------
+    def _open_stream(self, start_time, output_size):
+        """Returns (stream, from_cache); the first item of the stream is the clip's metadata."""
+        # Pre-transcoded frames (see video_cache.py) skip decoding entirely
+        cached = video_cache.open_stream(self.path, output_size, start_time)
+        if cached is not None:
+            return cached, True
+        # imageio-ffmpeg se importa con el primer video, no al arrancar el juego
+        try:
+            import imageio_ffmpeg
+        except Exception:
+            raise RuntimeError("imageio-ffmpeg no está disponible.") from None
+        input_params = ["-ss", "%.3f" % start_time] if start_time > 0 else None
+        output_params = ["-s", "%dx%d" % output_size] if output_size else None
+        stream = imageio_ffmpeg.read_frames(
+            self.path, pix_fmt=FRAME_PIX_FMT, bpp=FRAME_BPP,
+            input_params=input_params, output_params=output_params
+        )
+        return stream, False
+
+    def start(self, start_index=0):
+        # The worker opens ffmpeg at the current output size and closes it when it exits
+        self._decoder_done = False
+        args = (start_index, self._generation, self.output_size)
+        self._thread = threading.Thread(target=self._decode_loop, args=args, daemon=True)
+        self._thread.start()
+        return self
+
+    def _decode_loop(self, index, generation, output_size):
+        stream = None
+        try:
+            # Abrir ffmpeg y leer su cabecera: fuera del hilo principal. Los seeks que
+            # llegan mientras otro hilo abre su stream esperan aquí, y solo el último lo abre
+            with self._open_lock:
+                with self._cond:
+                    if generation != self._generation:
+                        return
+                with profiler.span("video.open"):
+                    stream, from_cache = self._open_stream(index / self.fps, output_size)
+                    meta = next(stream)
+            with self._cond:
+                if generation != self._generation:
+                    return
+                self.frame_size = tuple(meta["size"])
+                self.from_cache = from_cache
+                if not self.has_metadata:
+                    self.fps = float(meta.get("fps", 24)) or 24.0
+                    self.duration = float(meta.get("duration", 0)) or 0.0
+                    self.total_frames = max(1, int(self.duration * self.fps))
+                    self.has_metadata = True
+            size = self.frame_size
+            while True:
+                # Leer el siguiente frame de ffmpeg es el "decode" en la traza del perfilador
+                with profiler.span("video.decode"):
+                    raw = next(stream, None)
+                if raw is None or index >= self.total_frames:
+                    break
+                with self._cond:
+                    if generation != self._generation:
+                        return
+                    late = index < self._wanted_index
+                    if late:
+                        self.dropped_frames += 1
+                if not late:
+                    with self._cond:
+                        while len(self._buffer) >= self.buffer_size and generation == self._generation:
+                            self._cond.wait()
+                        if generation != self._generation:
+                            return
+                        self._buffer.append((index, raw, size))
+                        self._cond.notify_all()
+                index += 1
+        except Exception as e:
+            if generation == self._generation:
+                self.error = e
+        finally:
+            if stream is not None:
+                stream.close()
+            with self._cond:
+                if generation == self._generation:
+                    self._decoder_done = True
+                self._cond.notify_all()
+
+    def _stop_worker(self):
+        # The worker notices the new generation and shuts its own ffmpeg down;
+        # waiting for that here would stall the main loop for a few hundred ms.
+        with self._cond:
+            self._generation += 1
+            self._buffer.clear()
+            self._cond.notify_all()
+        self._thread = None
+
+    # --------------------------------------------------
+    # MAIN THREAD
+    # --------------------------------------------------
+    @property
+    def buffer_occupancy(self):
+        """Number of decoded frames waiting in the ring buffer."""
+        with self._cond:
+            return len(self._buffer)
+
+    def frame_for_time(self, video_time):
+        """Returns the surface to present at `video_time`, dropping frames that are already late."""
+        target = int(video_time * self.fps)
+        with self._cond:
+            self._wanted_index = target
+            presented = None
+            while self._buffer and self._buffer[0][0] <= target:
+                if presented is not None:
+                    self.dropped_frames += 1
+                presented = self._buffer.popleft()
+            if presented is not None:
+                self._cond.notify_all()
+        if presented is not None:
+            index, raw, size = presented
+            if self._surface is None or self._surface.get_size() != size:
+                self._surface = make_frame_surface(size)
+            with profiler.span("video.upload"):
+                upload_frame(self._surface, raw)
+            self.current_index = index
+            self.current_surface = self._surface
+        return self.current_surface
+
+    def is_ready(self):
+        """True once the first frame is buffered, or the worker stopped without one (see `error`)."""
+        with self._cond:
+            return bool(self._buffer) or self._decoder_done or self.current_surface is not None
+
+    def is_finished(self, video_time):
+        if self.error is not None:
+            return True
+        if not self.has_metadata:
+            return False
+        if video_time >= self.duration:
+            return True
+        with self._cond:
+            return self._decoder_done and not self._buffer and int(video_time * self.fps) > self.current_index
+
+    def scaled_surface(self, size):
+        """Returns the current frame at `size`, scaling each decoded frame at most once."""
+        surface = self.current_surface
+        if surface is None or surface.get_size() == tuple(size):
+            return surface
+        key = (self.current_index, tuple(size))
+        if key != self._scaled_key:
+            with profiler.span("video.smoothscale"):
+                self._scaled_surface = pygame.transform.smoothscale(surface, size)
+            self._scaled_key = key
+        return self._scaled_surface
+
+    def set_output_size(self, size):
+        """
+        Asks ffmpeg for frames at `size`, restarting it from the current frame.
+        Before start() the size is only stored and used when ffmpeg is opened.
+        """
+        size = tuple(size)
+        if size == self.output_size:
+            return
+        self.output_size = size
+        if self._thread is not None:
+            self._restart((self.current_index + 1) / self.fps)
+
+    def seek(self, video_time):
+        """
+        Restarts ffmpeg at `video_time` without blocking. Only used when the user
+        scrubs; repeated seeks while ffmpeg is still opening only open the last one.
+        """
+        video_time = max(0.0, min(video_time, self.duration))
+        self._restart(video_time)
+        self.current_index = int(video_time * self.fps) - 1
+        return video_time
+
+    def _restart(self, video_time):
+        # El hilo nuevo abre ffmpeg; hasta que lleguen sus frames se sigue viendo el actual
+        self._stop_worker()
+        start_index = int(video_time * self.fps)
+        self._wanted_index = start_index
+        self.start(start_index)
+
+    def close(self):
+        self._stop_worker()
@@ -0,0 +1,101 @@
+import json
+import os
+from scripts.utils.resource_manager import BASE_DIR
+
+SCENES_PATH = os.path.join(BASE_DIR, "assets", "scenes.json")
+
+# Estados que no son escenas de decisión pero a los que una elección puede llevar
+TERMINAL_STATES = ("ending_screen", "menu")
+# Pantallas que se recorren, en orden, antes de la primera escena
+INTRO_STATES = ("menu", "loading")
+
+
+class Choice:
+    """One button of a decision scene: where it is drawn and what picking it does."""
+
+    def __init__(self, data):
+        self.id = data["id"]
+        self.image = data["image"]
+        self.width = data["width"]
+        self.center = tuple(data["center"])
+        self.flags = dict(data.get("set", {}))
+        self.video = data.get("video")
+        self.sequence = list(data["sequence"]) if "sequence" in data else None
+        self.next = data["next"]
+
+    def clips(self):
+        """Video files this choice plays, in order."""
+        if self.sequence is not None:
+            return [item for item in self.sequence if not item.startswith("WAIT:")]
+        return [self.video] if self.video else []
+
+
+class Scene:
+    """A decision screen: a background and the choices drawn over it."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.background = data.get("background")
+        self.fill = tuple(data.get("fill", (0, 0, 0)))
+        self.choices = [Choice(button) for button in data["buttons"]]
+
+
+class SceneGraph:
+    """
+    The story as data (assets/scenes.json): every decision scene, its buttons,
+    the GameState flags each choice sets and the video or sequence it plays.
+    """
+
+    def __init__(self, data):
+        self.start = data["start"]
+        self.scenes = {name: Scene(name, scene) for name, scene in data["scenes"].items()}
+        self._check()
+
+    @classmethod
+    def load(cls, path=SCENES_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _check(self):
+        if self.start not in self.scenes:
+            raise ValueError(f"Start scene {self.start!r} is not defined")
+        for scene in self.scenes.values():
+            for choice in scene.choices:
+                if choice.next not in self.scenes and choice.next not in TERMINAL_STATES:
+                    raise ValueError(f"{scene.name}/{choice.id} leads to unknown scene {choice.next!r}")
+                if (choice.video is None) == (choice.sequence is None):
+                    raise ValueError(f"{scene.name}/{choice.id} needs exactly one of 'video' or 'sequence'")
+        unreachable = set(self.scenes) - self.reachable(self.start)
+        if unreachable:
+            print(f"Scenes not reachable from {self.start!r}: {', '.join(sorted(unreachable))}")
+
+    def get(self, name):
+        return self.scenes.get(name)
+
+    def __contains__(self, name):
+        return name in self.scenes
+
+    def next_states(self, name):
+        """
+        States entered directly after `name`: the targets of its choices. The
+        intro screens lead to every later intro screen and to the start scene,
+        so the first scene is prefetched from the menu. Terminal states lead
+        nowhere (a new game starts again from the menu).
+        """
+        if name in INTRO_STATES:
+            return list(INTRO_STATES[INTRO_STATES.index(name) + 1:]) + [self.start]
+        scene = self.scenes.get(name)
+        if scene is None:
+            return []
+        return list(dict.fromkeys(choice.next for choice in scene.choices))
+
+    def reachable(self, name):
+        """Every state that can still be reached from `name` (including itself)."""
+        seen = {name}
+        stack = [name]
+        while stack:
+            for nxt in self.next_states(stack.pop()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
@@ -0,0 +1,304 @@
+"""
+Headless, deterministic simulation of the story.
+
+HeadlessGame runs the real Game state machine (handle_events + update) on the
+SDL dummy drivers, with a fixed timestep, no drawing, no audio and stub video
+players that only keep time. Simulation replays scripted playthroughs by
+clicking the buttons of each decision scene, so it exercises the same event
+handling, scene graph and GameState code as the real game.
+
+Fades, the loading screen, black-screen waits and (stub) videos only run out a
+timer, so they are stepped with the coarse --transition-step (500 ms by default,
+one step per fade); decision scenes and the menu use --timestep. The layout of
+a state is built once when it is entered, not per step, and nothing is captured
+for the crossfade into a video. Measured on one core with --random 5000: about
+22 steps and 0.4 ms per playthrough (~2400 playthroughs/s); with
+--transition-step 0 every state runs at --timestep (~240 steps, ~750/s).
+
+From the project root:
+
+    python -m scripts.simulation --all                 # every path through the story
+    python -m scripts.simulation --random 5000 --seed 1
+"""
+import argparse
+import collections
+import os
+import random
+import time
+
+import pygame
+from scripts.game import Game
+from scripts.media.playback_clock import PlaybackClock
+from scripts.utils.resource_manager import ResourceManager
+
+
+class FixedClock:
+    """Drop-in for pygame.time.Clock that advances a fixed step per tick."""
+
+    def __init__(self, step_ms):
+        self.step_ms = step_ms
+        self.now_ms = 0
+
+    def tick(self, framerate=0):
+        self.now_ms += self.step_ms
+        return self.step_ms
+
+    def get_time(self):
+        return self.step_ms
+
+    def get_fps(self):
+        return 1000.0 / self.step_ms
+
+
+class SimulatedPlaybackClock(PlaybackClock):
+    """Video clock that follows the simulation clock instead of wall time or the mixer."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        super().__init__()
+
+    def reset(self, position=0.0, audio=False):
+        super().reset(position, audio=False)
+        self._start = self.clock.now_ms / 1000.0 - position
+
+    def time(self):
+        return self.clock.now_ms / 1000.0 - self._start
+
+
+class StubVideoPlayer:
+    """Keeps a clip's timing without decoding it. Missing files fail like the real player."""
+
+    def __init__(self, path, duration):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.fps = 24.0
+        self.duration = duration
+        self.current_index = -1
+        self.current_surface = None
+        self.dropped_frames = 0
+        self.error = None
+
+    def is_ready(self):
+        return True
+
+    def frame_for_time(self, t):
+        self.current_index = int(t * self.fps)
+        return None
+
+    def scaled_surface(self, size):
+        return None
+
+    def is_finished(self, t):
+        return t >= self.duration
+
+    def seek(self, t):
+        return max(0.0, min(t, self.duration))
+
+    def set_output_size(self, size):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullPrefetcher:
+    def prefetch(self, paths, output_size):
+        pass
+
+    def take(self, path, output_size):
+        return None
+
+    def cancel(self):
+        pass
+
+
+# Estados que solo esperan a que corra un temporizador
+TRANSITION_STATES = ("fading", "loading", "fading_to_level", "black_screen_wait", "playing_video", "fading_from_video")
+
+
+class HeadlessGame(Game):
+    """
+    Game without a window, audio or video decoding, stepped with a fixed
+    timestep (`transition_step_ms` in TRANSITION_STATES, if given).
+    """
+
+    def __init__(self, timestep_ms=16, video_seconds=0.0, size=(400, 300), transition_step_ms=None):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        self.video_seconds = video_seconds
+        self.timestep_ms = timestep_ms
+        self.transition_step_ms = transition_step_ms or timestep_ms
+        # Estado cuyo layout está construido (ver ensure_layout)
+        self.layout_state = None
+        super().__init__()
+        # Una ventana pequeña abarata el escalado de las escenas
+        self.screen = pygame.display.set_mode(size)
+        self.resize_elements(*size)
+        self.clock = FixedClock(timestep_ms)
+        self.video_clock = SimulatedPlaybackClock(self.clock)
+        self.prefetcher = NullPrefetcher()
+        # Nada se libera ni se desaloja: cada escena se carga una sola vez por proceso
+        ResourceManager.pin_groups(ResourceManager.manifest()["groups"])
+
+    def update_asset_groups(self):
+        self.asset_scene = self.state
+        if not ResourceManager.group_loaded(self.state):
+            ResourceManager.load_group(self.state)
+            # Las imágenes nunca se liberan: los layouts solo cambian cuando llega un grupo
+            self.invalidate_layouts()
+
+    def update_prefetch(self):
+        self.prefetch_state = self.state
+
+    def prefetch_next_in_sequence(self):
+        pass
+
+    def invalidate_layouts(self):
+        super().invalidate_layouts()
+        self.layout_state = None
+
+    def ensure_layout(self):
+        # Sin dibujar, el layout solo aporta los rects de botones y de la barra de carga:
+        # basta con construirlo al entrar al estado
+        if self.state != self.layout_state:
+            self.layout_state = self.state
+            super().ensure_layout()
+
+    def capture_video_crossfade(self):
+        return None
+
+    def play_background_music(self):
+        pass
+
+    def play_video_audio(self, video_path):
+        return False
+
+    def open_video(self, video_path):
+        return StubVideoPlayer(video_path, self.video_seconds)
+
+    def step(self):
+        self.clock.step_ms = self.transition_step_ms if self.state in TRANSITION_STATES else self.timestep_ms
+        self.clock.tick()
+        self.handle_events()
+        self.update()
+
+    def click(self, pos):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+        self.step()
+
+
+class StuckError(RuntimeError):
+    pass
+
+
+class Simulation:
+    """Replays playthroughs on one HeadlessGame."""
+
+    def __init__(self, timestep_ms=16, video_seconds=0.0, max_steps=100000, transition_step_ms=None):
+        self.game = HeadlessGame(timestep_ms, video_seconds, transition_step_ms=transition_step_ms)
+        self.max_steps = max_steps
+        self.steps = 0
+
+    def run_until(self, done):
+        game = self.game
+        for _ in range(self.max_steps):
+            if done():
+                return
+            game.step()
+            self.steps += 1
+        raise StuckError(f"Stuck in state {game.state!r} after {self.max_steps} steps")
+
+    def playthrough(self, choose):
+        """
+        Plays from the menu to the ending screen. `choose(scene)` returns the id of
+        the button to click in each decision scene. Returns (ending, path).
+        """
+        game = self.game
+        if game.state == "ending_screen":
+            # "Volver a jugar" reinicia GameState y vuelve al menú
+            game.step()
+            game.click(game.btn_volver_rect.center)
+        self.run_until(lambda: game.state == "menu")
+        game.step()
+        game.click(game.play_btn_rect.center)
+        path = []
+        while True:
+            self.run_until(lambda: game.state in game.scenes or game.state == "ending_screen")
+            if game.state == "ending_screen":
+                return game.game_state.calculate_ending(), tuple(path)
+            scene = game.scenes.get(game.state)
+            # Un paso más: la escena carga su grupo y construye sus botones
+            game.step()
+            self.steps += 1
+            choice_id = choose(scene)
+            rect = next(rect for choice, _, rect in game.current_layout().view["buttons"] if choice.id == choice_id)
+            path.append((scene.name, choice_id))
+            game.click(rect.center)
+
+
+def scripted(choices):
+    """Policy that clicks `choices` in order, one per decision scene."""
+    queue = collections.deque(choices)
+    return lambda scene: queue.popleft()
+
+
+def all_paths(graph):
+    """Every sequence of choice ids from the start scene to a non-decision state."""
+    paths = []
+
+    def walk(name, prefix):
+        scene = graph.get(name)
+        if scene is None:
+            paths.append(prefix)
+            return
+        for choice in scene.choices:
+            walk(choice.next, prefix + [choice.id])
+
+    walk(graph.start, [])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Play every path through the scene graph once.")
+    parser.add_argument("--random", type=int, default=0, help="Number of random playthroughs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timestep", type=int, default=16, help="Fixed timestep in ms.")
+    parser.add_argument("--transition-step", type=int, default=500,
+                        help="Timestep in ms for fades, waits and videos (0 = same as --timestep).")
+    parser.add_argument("--video-seconds", type=float, default=0.0, help="Simulated length of every clip.")
+    args = parser.parse_args()
+
+    # Los guiños del menú también usan random: misma semilla, misma simulación
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    sim = Simulation(args.timestep, args.video_seconds, transition_step_ms=args.transition_step)
+    runs = []
+    if args.all:
+        runs.extend(scripted(path) for path in all_paths(sim.game.scenes))
+    runs.extend((lambda scene: rng.choice(scene.choices).id) for _ in range(args.random))
+    if not runs:
+        parser.error("Nothing to do: pass --all and/or --random N")
+
+    # El primer recorrido carga las imágenes de cada escena; no se cuenta
+    sim.playthrough(scripted(all_paths(sim.game.scenes)[0]))
+    sim.steps = 0
+
+    endings = collections.Counter()
+    start = time.perf_counter()
+    for policy in runs:
+        ending, _ = sim.playthrough(policy)
+        endings[ending] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(runs)} playthroughs in {elapsed:.2f} s ({len(runs) / elapsed:.0f}/s), "
+          f"{sim.steps} steps ({sim.steps / len(runs):.0f} per playthrough) at {args.timestep} ms "
+          f"({args.transition_step or args.timestep} ms in transitions)")
+    for ending, count in endings.most_common():
+        print(f"{count:>7}  {ending}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
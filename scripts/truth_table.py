@@ -0,0 +1,97 @@
+"""
+Truth table of the story's endings.
+
+Every decision is a proposition (P, Q, R, ...) and every ending a formula
+over them (assets/endings.json). TruthTable lists the ending of all 2^n
+assignments, evaluated at once with NumPy: the assignments are the bits of
+0..2^n-1 and each formula is evaluated over whole columns, so adding a
+scene adds a column, not a loop.
+
+From the project root:
+
+    python -m scripts.truth_table            # table, distribution and rule check
+"""
+import collections
+import functools
+
+import numpy as np
+from scripts.endings import EndingRules, assignments
+
+
+def ending_counts(rules, propositions=None, chunk_rows=1 << 20):
+    """
+    Rows per ending without keeping the table: the assignments are generated
+    and evaluated in chunks, so memory stays flat as propositions are added.
+    `propositions` defaults to the rules' own.
+    """
+    letters = [p.letter for p in (propositions or rules.propositions)]
+    total = 1 << len(letters)
+    counts = np.zeros(len(rules.names), dtype=np.int64)
+    for start in range(0, total, chunk_rows):
+        values = assignments(len(letters), start, min(start + chunk_rows, total))
+        endings = rules.evaluate({letter: values[:, i] for i, letter in enumerate(letters)})
+        counts += np.bincount(endings, minlength=len(rules.names))
+    return dict(zip(rules.names, counts.tolist()))
+
+
+class TruthTable:
+    """Every assignment of the propositions and the ending it leads to."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.propositions = rules.propositions
+        self.letters = rules.letters
+        self.values = assignments(len(self.letters))
+        # La tabla compilada de las reglas ya tiene el final de cada fila
+        self.endings = rules.lookup
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def default(cls):
+        """The table of the default ending rules, built once per process."""
+        return cls(EndingRules.default())
+
+    def __len__(self):
+        return len(self.values)
+
+    def row_of(self, state):
+        """Index of the row that matches the decisions in `state`."""
+        return self.rules.row_of(state)
+
+    def ending_of(self, row):
+        return self.rules.names[self.endings[row]]
+
+    def rows(self):
+        """(values, ending) for every row, values as a tuple of bools."""
+        for values, ending in zip(self.values.tolist(), self.endings.tolist()):
+            yield tuple(values), self.rules.names[ending]
+
+    def distribution(self):
+        """Rows per ending, including endings no assignment reaches."""
+        counts = np.bincount(self.endings, minlength=len(self.rules.names))
+        return dict(zip(self.rules.names, counts.tolist()))
+
+    def uncovered(self):
+        return [ending for ending, count in self.distribution().items() if count == 0]
+
+
+def main():
+    table = TruthTable.default()
+    print("  ".join(table.letters) + "  Final")
+    for values, ending in table.rows():
+        print("  ".join("V" if value else "F" for value in values) + f"  {ending}")
+    print()
+    for ending, count in collections.Counter(table.distribution()).most_common():
+        print(f"{count:>4} / {len(table)}  {ending}")
+
+    report = table.rules.report()
+    for (first, second), rows in report["overlaps"].items():
+        print(f"Solapamiento: {first!r} y {second!r} en las filas {rows} (gana {first!r})")
+    if report["unreachable"]:
+        print(f"Finales sin ninguna combinación: {', '.join(report['unreachable'])}")
+    if not report["overlaps"] and not report["unreachable"]:
+        print("Cada combinación lleva a exactamente un final y todos los finales son alcanzables.")
+
+
+if __name__ == "__main__":
+    main()
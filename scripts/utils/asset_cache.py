@@ -0,0 +1,115 @@
+from collections import OrderedDict
+
+
+def surface_bytes(surface):
+    """Memory held by a Surface's pixels (pitch includes row padding)."""
+    if surface.get_parent() is not None:
+        # Un subsurface (sprite de un atlas) comparte los píxeles del atlas: se cuenta el atlas,
+        # que AssetCache mantiene residente (y desaloja) junto con sus sprites (ver put)
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+class AssetCache:
+    """
+    Least-recently-used cache with a byte budget.
+
+    Entries are evicted oldest-first once the budget is exceeded, except for
+    pinned keys, which stay resident even if that means going over budget.
+
+    An entry can be stored with a parent (an atlas page for its sprites): the
+    parent and its children form one eviction unit. Using a child keeps the
+    parent recent, a pinned child pins the parent, and removing the parent
+    removes its children, so no child outlives the bytes it was charged to.
+    """
+
+    def __init__(self, budget_bytes, sizeof=surface_bytes):
+        self.budget_bytes = budget_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._pinned = set()
+        # Padre -> claves hijas, e hija -> padre
+        self._children = {}
+        self._parents = {}
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        parent = self._parents.get(key)
+        if parent is not None:
+            self._entries.move_to_end(parent)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def put(self, key, value, parent=None):
+        """Stores `value`; with `parent`, it lives and is evicted together with that entry."""
+        if parent is not None and parent not in self._entries:
+            raise KeyError(f"Parent {parent!r} of {key!r} is not cached")
+        if key in self._entries:
+            del self[key]
+        size = self.sizeof(value)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.total_bytes += size
+        if parent is not None:
+            self._parents[key] = parent
+            self._children.setdefault(parent, set()).add(key)
+            self._entries.move_to_end(parent)
+        self._evict()
+
+    def __delitem__(self, key):
+        del self._entries[key]
+        self.total_bytes -= self._sizes.pop(key)
+        for child in self._children.pop(key, ()):
+            self._parents.pop(child, None)
+            if child in self._entries:
+                del self[child]
+        parent = self._parents.pop(key, None)
+        if parent is not None:
+            self._children[parent].discard(key)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def pin(self, keys):
+        """Replaces the set of keys that may not be evicted."""
+        self._pinned = set(keys)
+        self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.budget_bytes:
+            return
+        for key in list(self._entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            if key not in self._entries or key in self._pinned or self._children.get(key, set()) & self._pinned:
+                continue
+            del self[key]
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,182 @@
+"""
+Content-hash deduplication and sprite atlases.
+
+The build step hashes every image in the manifest, collapses files with the
+same bytes into one (e.g. the BotonSi.png copies under images/, Nivel3/ and
+Nivel4/), and packs the sprites listed under "atlases" in the manifest into
+one PNG per atlas. Each sprite is trimmed to its visible pixels; the index
+keeps its rect in the atlas, its offset in the original canvas and the canvas
+size, so layouts keep working in canvas coordinates.
+
+Build the atlases (from the project root) whenever an image changes:
+
+    python -m scripts.utils.atlas
+
+The index is only used while every source is unchanged: mtime and size are
+the fast path, and when the mtime differs (a copied tree, a PyInstaller
+extraction) the size and content hash decide, and the index is re-stamped.
+Otherwise ResourceManager loads the individual files as before.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pygame
+import constantes
+from scripts.utils.resource_manager import BASE_DIR, MANIFEST_PATH
+
+ATLAS_DIR = os.path.join(BASE_DIR, "assets", "atlas")
+INDEX_PATH = os.path.join(ATLAS_DIR, "index.json")
+
+log = logging.getLogger(__name__)
+
+
+def content_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {"mtime": stat.st_mtime, "bytes": stat.st_size}
+
+
+def load_index():
+    """Returns the atlas index if it exists and every source is unchanged, else None."""
+    try:
+        with open(INDEX_PATH, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    restamped = False
+    for name, source in index["sources"].items():
+        full_path = os.path.join(BASE_DIR, source["path"])
+        try:
+            stamp = _source_stamp(full_path)
+            if stamp == source["stamp"]:
+                continue
+            # Solo cambió el mtime (copia del árbol, extracción del bundle): decide el contenido
+            if stamp["bytes"] != source["stamp"]["bytes"] or content_hash(full_path) != source["hash"]:
+                log.warning("Atlas index is stale (%s changed); loading images one by one. "
+                            "Run python -m scripts.utils.atlas", name)
+                return None
+        except OSError as e:
+            log.warning("Atlas index unusable (%s: %s); loading images one by one", name, e)
+            return None
+        source["stamp"] = stamp
+        restamped = True
+    for atlas in index["atlases"].values():
+        if not os.path.exists(os.path.join(ATLAS_DIR, atlas["file"])):
+            log.warning("Atlas page %s is missing; loading images one by one", atlas["file"])
+            return None
+    if restamped:
+        # Con los mtimes nuevos el próximo arranque vuelve al camino rápido (si se puede escribir)
+        try:
+            with open(INDEX_PATH, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2, ensure_ascii=False)
+        except OSError:
+            pass
+    return index
+
+
+def _shelf_pack(sizes, width, padding):
+    positions = {}
+    x = y = shelf_h = 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w + padding > width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        positions[key] = (x + padding, y + padding)
+        x += w + padding
+        shelf_h = max(shelf_h, h + 2 * padding)
+    return positions, (width, y + shelf_h)
+
+
+def pack(sizes, max_width, padding):
+    """
+    Shelf packing: tallest sprites first, left to right, a new shelf when a row
+    is full. Every width from the widest sprite up to `max_width` is tried and
+    the smallest atlas wins. Returns ({key: (x, y)}, (width, height)).
+    """
+    widest = max(w for w, _ in sizes.values()) + 2 * padding
+    candidates = [_shelf_pack(sizes, width, padding) for width in range(widest, max(widest, max_width) + 1, 8)]
+    return min(candidates, key=lambda packed: packed[1][0] * packed[1][1])
+
+
+def build(manifest):
+    """Hashes the manifest's images, packs its atlases and writes them with the index. Returns the index."""
+    images = manifest["images"]
+    sources = {}
+    aliases = {}
+    by_hash = {}
+    for name, entry in images.items():
+        path = os.path.relpath(os.path.join(BASE_DIR, "assets", "images", entry["path"]), BASE_DIR)
+        full_path = os.path.join(BASE_DIR, path)
+        if not os.path.exists(full_path):
+            print(f"missing {path}")
+            continue
+        digest = content_hash(full_path)
+        sources[name] = {"path": path, "hash": digest, "stamp": _source_stamp(full_path)}
+        if digest in by_hash:
+            aliases[name] = by_hash[digest]
+        else:
+            by_hash[digest] = name
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    atlases = {}
+    for atlas_name, names in manifest.get("atlases", {}).items():
+        sprites = {}
+        trimmed = {}
+        for name in names:
+            name = aliases.get(name, name)
+            if name not in sources or name in trimmed:
+                continue
+            image = pygame.image.load(os.path.join(BASE_DIR, sources[name]["path"]))
+            # Los PNG traen un halo casi invisible en todo el lienzo; se recorta a lo visible
+            rect = image.get_bounding_rect(min_alpha=constantes.ATLAS_TRIM_MIN_ALPHA)
+            trimmed[name] = image.subsurface(rect)
+            sprites[name] = {"offset": [rect.x, rect.y], "size": list(image.get_size())}
+        if not trimmed:
+            continue
+        positions, page_size = pack(
+            {name: image.get_size() for name, image in trimmed.items()},
+            constantes.ATLAS_PAGE_WIDTH, constantes.ATLAS_PADDING,
+        )
+        page = pygame.Surface(page_size, pygame.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+        for name, image in trimmed.items():
+            page.blit(image, positions[name])
+            sprites[name]["rect"] = [*positions[name], *image.get_size()]
+        file_name = f"{atlas_name}.png"
+        pygame.image.save(page, os.path.join(ATLAS_DIR, file_name))
+        atlases[atlas_name] = {"file": file_name, "size": list(page_size), "sprites": sprites}
+
+    index = {"sources": sources, "aliases": aliases, "atlases": atlases}
+    with open(INDEX_PATH, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    return index
+
+
+def main():
+    argparse.ArgumentParser(description="Deduplicate images and build the sprite atlases.").parse_args()
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        manifest = json.load(f)
+    index = build(manifest)
+
+    for alias, name in sorted(index["aliases"].items()):
+        print(f"same    {alias} -> {name}")
+    canvas_bytes = atlas_bytes = 0
+    for atlas_name, atlas in index["atlases"].items():
+        w, h = atlas["size"]
+        atlas_bytes += w * h * 4
+        canvas_bytes += sum(s["size"][0] * s["size"][1] * 4 for s in atlas["sprites"].values())
+        print(f"atlas   {atlas_name}: {len(atlas['sprites'])} sprites in {w}x{h}")
+    print(f"{canvas_bytes / (1024 * 1024):.0f} MB of sprite canvases packed into "
+          f"{atlas_bytes / (1024 * 1024):.0f} MB of atlases in {ATLAS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Opt-in frame profiler.
+
+Game.run() wraps each phase of a frame (tick, events, update, draw) in a span,
+and the hot paths add sub-spans: video decode (on the decoder thread), frame
+upload, smoothscale, scene blits and the display flip. When the profiler is
+disabled `span()` returns a shared no-op context manager, so the cost is one
+attribute check per span.
+
+Enable it with PROFILER_ENABLED in constantes.py, or press F3 in game to show
+the overlay (FPS, p50/p95/p99 frame time, busy time, state and a graph of the
+last frames). On exit the spans are written to PROFILER_TRACE_PATH (relative to
+the directory the game was launched from, falling back to the home directory)
+in the Chrome trace event format: open it in chrome://tracing or https://ui.perfetto.dev.
+"""
+import collections
+import json
+import os
+import threading
+import time
+import pygame
+import constantes
+from scripts.utils.startup import launch_dir
+from scripts.utils.stats import percentile
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class FrameProfiler:
+    """
+    Rolling per-frame timings and a bounded trace of every span.
+
+    `frame_ms` holds the last PROFILER_HISTORY frame times (the whole loop,
+    including the wait in clock.tick) and `phase_ms` the time each main-thread
+    span took per frame. Trace events stop being recorded after
+    PROFILER_TRACE_MAX_EVENTS; the rolling statistics keep going.
+    """
+
+    def __init__(self, enabled=False, history=constantes.PROFILER_HISTORY, max_events=constantes.PROFILER_TRACE_MAX_EVENTS):
+        self.enabled = enabled
+        self.overlay_visible = False
+        self.max_events = max_events
+        self.frame_ms = collections.deque(maxlen=history)
+        self.phase_ms = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        # (nombre, inicio, fin, hilo, args) en segundos de perf_counter
+        self.events = []
+        self.dropped_events = 0
+        self.origin = time.perf_counter()
+        self.main_thread = threading.get_ident()
+        self._frame_start = None
+        self._frame_spans = collections.Counter()
+        self._thread_names = {}
+        # Overlay: se vuelve a dibujar cada PROFILER_OVERLAY_REFRESH_MS
+        self._font = None
+        self._overlay = None
+        self._overlay_at = 0
+        self.overlay_key = None
+        self.overlay_rect = pygame.Rect(0, 0, 0, 0)
+
+    def span(self, name):
+        """Context manager that times `name`. A no-op while the profiler is disabled."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end, args=None):
+        thread = threading.get_ident()
+        if len(self.events) < self.max_events:
+            self.events.append((name, start, end, thread, args))
+            if thread not in self._thread_names:
+                self._thread_names[thread] = threading.current_thread().name
+        else:
+            self.dropped_events += 1
+        if thread == self.main_thread:
+            self._frame_spans[name] += end - start
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+            self._frame_spans.clear()
+
+    def end_frame(self, state=None):
+        if not self.enabled or self._frame_start is None:
+            return
+        end = time.perf_counter()
+        self.record("frame", self._frame_start, end, {"state": state})
+        self.frame_ms.append((end - self._frame_start) * 1000)
+        for name, seconds in self._frame_spans.items():
+            if name != "frame":
+                self.phase_ms[name].append(seconds * 1000)
+        self._frame_start = None
+
+    def toggle_overlay(self):
+        # F3 también activa el perfilador si estaba apagado
+        self.enabled = True
+        self.overlay_visible = not self.overlay_visible
+        if not self.overlay_visible:
+            self.overlay_key = None
+
+    # --------------------------------------------------
+    # STATISTICS
+    # --------------------------------------------------
+    def stats(self):
+        """
+        FPS, frame-time percentiles and, per phase, the mean time over the
+        frames of the rolling window in which that phase ran.
+        """
+        frames = list(self.frame_ms)
+        if not frames:
+            return {"frames": 0}
+        busy = [f - t for f, t in zip(frames, self.phase_ms.get("tick", [0.0] * len(frames)))]
+        return {
+            "frames": len(frames),
+            "fps": 1000.0 * len(frames) / max(1e-6, sum(frames)),
+            "p50_ms": percentile(frames, 0.50),
+            "p95_ms": percentile(frames, 0.95),
+            "p99_ms": percentile(frames, 0.99),
+            "busy_p95_ms": percentile(busy, 0.95),
+            "phases_ms": {name: sum(v) / len(v) for name, v in self.phase_ms.items() if v},
+        }
+
+    def histogram(self, edges=(4, 8, 12, 16.7, 20, 33.3, 50)):
+        """Frames of the rolling window per frame-time bucket: {"<4": n, ..., ">=50": n}."""
+        labels = [f"<{edge:g}" for edge in edges] + [f">={edges[-1]:g}"]
+        counts = dict.fromkeys(labels, 0)
+        for ms in self.frame_ms:
+            for edge, label in zip(edges, labels):
+                if ms < edge:
+                    counts[label] += 1
+                    break
+            else:
+                counts[labels[-1]] += 1
+        return counts
+
+    # --------------------------------------------------
+    # OVERLAY
+    # --------------------------------------------------
+    def update_overlay(self, state, screen_size):
+        """
+        Re-renders the overlay at most every PROFILER_OVERLAY_REFRESH_MS and
+        places it in the bottom-left corner. `overlay_rect` also covers the
+        previous placement, so a dirty-rect redraw erases a wider old overlay.
+        Returns the content key (None while hidden).
+        """
+        if not self.overlay_visible:
+            return None
+        now = pygame.time.get_ticks()
+        if self._overlay is not None and now - self._overlay_at < constantes.PROFILER_OVERLAY_REFRESH_MS:
+            return self.overlay_key
+        if self._font is None:
+            self._font = pygame.font.SysFont("Consolas", 14)
+        s = self.stats()
+        phases = s.get("phases_ms", {})
+        lines = [
+            f"FPS {s.get('fps', 0):5.1f}   {state}",
+            f"frame p50 {s.get('p50_ms', 0):5.1f}  p95 {s.get('p95_ms', 0):5.1f}  p99 {s.get('p99_ms', 0):5.1f} ms",
+            f"busy p95 {s.get('busy_p95_ms', 0):5.1f} ms  upd {phases.get('update', 0):.1f}  draw {phases.get('draw', 0):.1f}",
+        ]
+        line_h = self._font.get_linesize()
+        graph_h = 40
+        width = max(self._font.size(line)[0] for line in lines) + 12
+        surface = pygame.Surface((width, line_h * len(lines) + graph_h + 14), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            surface.blit(self._font.render(line, True, (230, 230, 230)), (6, 4 + i * line_h))
+
+        # Últimos frames: una barra por frame, con guías en 16.7 ms (60 fps) y 33.3 ms (30 fps)
+        top = 8 + line_h * len(lines)
+        scale = graph_h / 50.0
+        for guide, color in ((16.7, (90, 200, 120)), (33.3, (220, 170, 60))):
+            y = top + graph_h - int(guide * scale)
+            pygame.draw.line(surface, color, (6, y), (width - 6, y))
+        recent = list(self.frame_ms)[-(width - 12):]
+        for x, ms in enumerate(recent):
+            h = min(graph_h, int(ms * scale))
+            color = (120, 220, 120) if ms <= 17.5 else (230, 180, 60) if ms <= 34 else (230, 80, 80)
+            pygame.draw.line(surface, color, (6 + x, top + graph_h), (6 + x, top + graph_h - h))
+
+        rect = surface.get_rect(bottomleft=(8, screen_size[1] - 8))
+        self.overlay_rect = rect.union(self.overlay_rect) if self.overlay_rect.width else rect
+        self._overlay = surface
+        self._overlay_at = now
+        self.overlay_key = now
+        return self.overlay_key
+
+    def draw_overlay(self, target):
+        if self.overlay_visible and self._overlay is not None:
+            target.blit(self._overlay, self._overlay.get_rect(bottomleft=(8, target.get_height() - 8)))
+
+    # --------------------------------------------------
+    # TRACE
+    # --------------------------------------------------
+    def dump_trace(self, path=None):
+        """
+        Writes the recorded spans as Chrome trace events to `path` (default
+        PROFILER_TRACE_PATH). A relative path is taken from the launch directory,
+        or from the home directory if that one is not writable. Returns the path
+        written, or None if nothing was recorded or no location was writable.
+        """
+        if not self.events:
+            return None
+        path = path or constantes.PROFILER_TRACE_PATH
+        if os.path.isabs(path):
+            candidates = [path]
+        else:
+            # main.py trabaja dentro del proyecto (o de _MEIPASS): la traza va donde la pueda encontrar el usuario
+            candidates = [os.path.join(launch_dir, path), os.path.join(os.path.expanduser("~"), path)]
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._thread_names.items()
+        ]
+        for name, start, end, tid, args in self.events:
+            event = {
+                "name": name, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_events": self.dropped_events}}
+        for candidate in candidates:
+            try:
+                with open(candidate, "w", encoding="utf-8") as f:
+                    json.dump(trace, f)
+                return candidate
+            except OSError as e:
+                print(f"No se pudo guardar la traza en {candidate}: {e}")
+        return None
+
+
+# Un único perfilador por proceso: el bucle principal, el video y los recursos escriben en él
+profiler = FrameProfiler(enabled=constantes.PROFILER_ENABLED)
@@ -1,6 +1,22 @@
 import pygame
 import os
 import sys
+import json
+from concurrent.futures import ThreadPoolExecutor, wait
+import constantes
+from scripts.utils.asset_cache import AssetCache
+from scripts.utils.profiler import profiler
+
+
+def _sound_bytes(sound):
+    # Decoded PCM: samples * channels * bytes per sample at the mixer's format
+    freq, size, channels = pygame.mixer.get_init() or (44100, -16, 2)
+    return int(sound.get_length() * freq) * channels * (abs(size) // 8)
+
+
+def _font_bytes(font):
+    # pygame does not expose a font's footprint; count a typical glyph cache
+    return constantes.FONT_CACHE_ENTRY_BYTES
 
 def _get_base_dir():
     """Returns the base project directory whether running normally or from a PyInstaller exe."""
@@ -12,43 +28,447 @@ def _get_base_dir():
         return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 BASE_DIR = _get_base_dir()
+MANIFEST_PATH = os.path.join(BASE_DIR, "assets", "manifest.json")
+
+
+def _decode_image(full_path):
+    # Runs on a loader thread: decode only. convert_alpha() needs the display, so it happens on the main thread.
+    try:
+        return pygame.image.load(full_path)
+    except (pygame.error, FileNotFoundError) as e:
+        return e
+
+
+class AssetLoadJob:
+    """
+    A batch of images being decoded in the background by ResourceManager.load_images_async.
+    Call `poll()` once per frame from the main loop; progress is measured in file bytes.
+
+    Each group of the job becomes resident as soon as its own images are in,
+    not when the whole batch is. Images another job is already decoding are
+    awaited, not decoded twice.
+    """
+
+    def __init__(self, entries, executor, groups=()):
+        self.groups = list(groups)
+        # Grupo -> claves que le faltan; se marca residente al vaciarse
+        self._group_keys = {g: {key for key, _ in ResourceManager._group_entries([g])} for g in self.groups}
+        # Grupos que quedaron residentes en el último poll()
+        self.newly_resident = []
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self._pending = []
+        for name, path in entries:
+            full_path = ResourceManager.image_path(path)
+            try:
+                size = os.path.getsize(full_path)
+            except OSError:
+                size = 0
+            self.total_bytes += size
+            if name in ResourceManager._images:
+                ResourceManager._paths[name] = full_path
+                self.done_bytes += size
+                continue
+            future = ResourceManager._decoding.get(name)
+            if future is None:
+                future = ResourceManager._decoding[name] = executor.submit(_decode_image, full_path)
+            self._pending.append((name, full_path, size, future))
+        self._mark_resident()
+
+    @property
+    def progress(self):
+        """Fraction of bytes loaded, from 0.0 to 1.0."""
+        if not self._pending:
+            return 1.0
+        return self.done_bytes / max(1, self.total_bytes)
+
+    @property
+    def done(self):
+        return not self._pending
+
+    def wait(self):
+        """Blocks until every image has been decoded, then converts them like poll()."""
+        wait([future for *_, future in self._pending])
+        return self.poll()
+
+    def poll(self):
+        """Converts every image that finished decoding and returns the progress."""
+        still_pending = []
+        for name, full_path, size, future in self._pending:
+            if not future.done():
+                still_pending.append((name, full_path, size, future))
+                continue
+            # Si otro trabajo compartía el decode, el primero en verlo terminado lo convierte
+            if ResourceManager._decoding.get(name) is future:
+                del ResourceManager._decoding[name]
+                result = future.result()
+                if isinstance(result, Exception):
+                    print(f"Unable to load image at {full_path}: {result}")
+                elif name not in ResourceManager._images:
+                    ResourceManager._images[name] = result.convert_alpha()
+                    ResourceManager._paths[name] = full_path
+            self.done_bytes += size
+        self._pending = still_pending
+        self._mark_resident()
+        return self.progress
+
+    def _mark_resident(self):
+        pending = {name for name, *_ in self._pending}
+        finished = [group for group, keys in self._group_keys.items() if not keys & pending]
+        for group in finished:
+            del self._group_keys[group]
+        # Un grupo que retain_groups soltó mientras se cargaba no vuelve a quedar residente
+        self.newly_resident = [group for group in finished if ResourceManager.group_wanted(group)]
+        ResourceManager._resident_groups.update(self.newly_resident)
+
 
 class ResourceManager:
     """
     Centralized Resource Manager to load and cache game assets.
+
+    Images are declared per scene in assets/manifest.json. A scene's group is
+    loaded when it is entered, the groups it leads to are loaded in the
+    background, and groups that can no longer be reached are released. Which
+    groups those are comes from the scene graph (SceneGraph.next_states).
+
+    Images, sounds and fonts live in byte-budgeted LRU caches. The current
+    scene's images are pinned; anything else may be evicted and is reloaded
+    from disk the next time it is asked for.
     """
-    _images = {}
-    _sounds = {}
-    _fonts = {}
+    _images = AssetCache(constantes.IMAGE_CACHE_BUDGET_MB * 1024 * 1024)
+    _sounds = AssetCache(constantes.SOUND_CACHE_BUDGET_MB * 1024 * 1024, sizeof=_sound_bytes)
+    _fonts = AssetCache(constantes.FONT_CACHE_BUDGET_MB * 1024 * 1024, sizeof=_font_bytes)
+    # (texto, familia, tamaño, estilo, color) -> texto renderizado
+    _texts = AssetCache(constantes.TEXT_CACHE_BUDGET_MB * 1024 * 1024)
+    # (nombre, tamaño, filtro) -> copia escalada
+    _scaled = AssetCache(constantes.SCALED_CACHE_BUDGET_MB * 1024 * 1024)
+    # Nombre -> ruta completa, para recargar lo que el LRU haya desalojado
+    _paths = {}
+    _sound_paths = {}
+    _executor = None
+    # Clave -> future de las imágenes que se están decodificando ahora mismo
+    _decoding = {}
+    _manifest = None
+    _resident_groups = set()
+    # Grupos que conservó el último retain_groups (None: todavía no se liberó nada)
+    _wanted_groups = None
+    # Índice de atlas.py: None sin cargar, False si no hay uno vigente
+    _atlas = None
+    # Sprite -> (clave del atlas, ruta del atlas, rect, desplazamiento, tamaño del lienzo)
+    _sprites = {}
+
+    @classmethod
+    def image_path(cls, path):
+        return os.path.join(BASE_DIR, "assets", "images", path)
 
     @classmethod
     def load_image(cls, name, path):
-        if name not in cls._images:
-            full_path = os.path.join(BASE_DIR, "assets", "images", path)
-            try:
-                image = pygame.image.load(full_path).convert_alpha()
-                cls._images[name] = image
-            except (pygame.error, FileNotFoundError) as e:
-                print(f"Unable to load image at {full_path}: {e}")
+        key = cls._key(name)
+        image = cls._images.get(key)
+        if image is None:
+            if key in cls._sprites:
+                image = cls._load_sprite(key)
+            else:
+                image = cls._load_image_file(key, cls.image_path(path))
+        return image
+
+    @classmethod
+    def _load_image_file(cls, name, full_path):
+        try:
+            image = pygame.image.load(full_path).convert_alpha()
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Unable to load image at {full_path}: {e}")
+            return None
+        cls._images[name] = image
+        cls._paths[name] = full_path
+        return image
+
+    @classmethod
+    def _load_sprite(cls, key):
+        page_key, page_path, rect = cls._sprites[key][:3]
+        page = cls._images.get(page_key)
+        if page is None:
+            page = cls._load_image_file(page_key, page_path)
+            if page is None:
                 return None
-        return cls._images[name]
+        image = page.subsurface(rect)
+        cls._images.put(key, image, parent=page_key)
+        return image
 
+    # --------------------------------------------------
+    # ATLAS / DEDUPLICATION
+    # --------------------------------------------------
     @classmethod
-    def load_sound(cls, name, path):
-        if name not in cls._sounds:
-            full_path = os.path.join(BASE_DIR, "assets", "sounds", path)
-            try:
-                sound = pygame.mixer.Sound(full_path)
-                cls._sounds[name] = sound
-            except (pygame.error, FileNotFoundError) as e:
-                print(f"Unable to load sound at {full_path}: {e}")
+    def atlas_index(cls):
+        """The sprite atlas index built by scripts/utils/atlas.py, or None if there is no fresh one."""
+        if cls._atlas is None:
+            from scripts.utils import atlas
+
+            cls._atlas = atlas.load_index() or False
+            if cls._atlas:
+                for atlas_name, entry in cls._atlas["atlases"].items():
+                    page_key = f"atlas:{atlas_name}"
+                    page_path = os.path.join(atlas.ATLAS_DIR, entry["file"])
+                    for name, sprite in entry["sprites"].items():
+                        cls._sprites[name] = (page_key, page_path, pygame.Rect(sprite["rect"]),
+                                              tuple(sprite["offset"]), tuple(sprite["size"]))
+        return cls._atlas or None
+
+    @classmethod
+    def _key(cls, name):
+        """Cache key of image `name`: images with identical bytes share one key."""
+        index = cls.atlas_index()
+        return index["aliases"].get(name, name) if index else name
+
+    @classmethod
+    def _keys(cls, names):
+        """Cache keys of `names`, plus the atlases their sprites live in."""
+        keys = {cls._key(name) for name in names}
+        return keys | {cls._sprites[key][0] for key in keys if key in cls._sprites}
+
+    @classmethod
+    def image_size(cls, name):
+        """
+        Size of image `name` as drawn by the layouts. For an atlas sprite this is
+        its original canvas, not the trimmed subsurface. None if not resident.
+        """
+        key = cls._key(name)
+        if key in cls._sprites:
+            return cls._sprites[key][4]
+        image = cls.scene_image(name)
+        return image.get_size() if image is not None else None
+
+    @classmethod
+    def load_images_async(cls, entries, groups=()):
+        """
+        Starts decoding `entries` ((name, path) pairs) on a thread pool and returns an AssetLoadJob.
+        The images become available through get_image as the job is polled.
+        """
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=constantes.ASSET_LOADER_THREADS, thread_name_prefix="assets")
+        return AssetLoadJob(entries, cls._executor, groups)
+
+    # --------------------------------------------------
+    # MANIFEST / SCENE GROUPS
+    # --------------------------------------------------
+    @classmethod
+    def manifest(cls):
+        if cls._manifest is None:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                cls._manifest = json.load(f)
+        return cls._manifest
+
+    @classmethod
+    def has_group(cls, group):
+        return group in cls.manifest()["groups"]
+
+    @classmethod
+    def group_wanted(cls, group):
+        """False if the last retain_groups released `group`; a background load then leaves it non-resident."""
+        return cls._wanted_groups is None or group in cls._wanted_groups
+
+    @classmethod
+    def group_loaded(cls, group):
+        return group in cls._resident_groups
+
+    @classmethod
+    def group_blocks(cls, group):
+        """False for groups whose screen can be drawn before their images arrive (see the manifest)."""
+        return cls.manifest()["groups"][group].get("blocking", True)
+
+    @classmethod
+    def _group_entries(cls, groups):
+        # (clave, ruta) a decodificar: las copias idénticas y los sprites de un mismo atlas se cargan una vez
+        images = cls.manifest()["images"]
+        entries = {}
+        for group in groups:
+            for name in cls.manifest()["groups"][group]["images"]:
+                key = cls._key(name)
+                if key in cls._sprites:
+                    page_key, page_path = cls._sprites[key][:2]
+                    entries.setdefault(page_key, page_path)
+                else:
+                    entries.setdefault(key, images[name]["path"])
+        return list(entries.items())
+
+    @classmethod
+    def load_group(cls, group):
+        """
+        Loads every image of `group` synchronously. The files are decoded in
+        parallel on the loader threads (reusing decodes already in flight);
+        this returns once all of them are resident.
+        """
+        cls.load_images_async(cls._group_entries([group])).wait()
+        expected = cls.manifest()["images"]
+        for name in cls.manifest()["groups"][group]["images"]:
+            image = cls.load_image(name, expected[name]["path"])
+            size = expected[name].get("size")
+            if image is not None and size and list(cls.image_size(name)) != size:
+                print(f"Image {name} is {cls.image_size(name)}, manifest expects {tuple(size)}")
+        cls._resident_groups.add(group)
+
+    @classmethod
+    def load_groups_async(cls, groups):
+        """Loads `groups` in the background; each becomes resident once its images are in."""
+        return cls.load_images_async(cls._group_entries(groups), groups=groups)
+
+    @classmethod
+    def retain_groups(cls, keep):
+        """Releases every group outside `keep` (persistent groups are always kept; unknown names are ignored)."""
+        groups = cls.manifest()["groups"]
+        keep = {name for name in keep if name in groups} | {name for name, group in groups.items() if group.get("persistent")}
+        kept_images = cls._keys(name for g in keep for name in groups[g]["images"])
+        for name in list(cls._images):
+            if name not in kept_images:
+                del cls._images[name]
+        for key in list(cls._scaled):
+            if key[0] not in kept_images:
+                del cls._scaled[key]
+        cls._resident_groups &= keep
+        cls._wanted_groups = keep
+
+    @classmethod
+    def pin_groups(cls, groups):
+        """Protects the images of `groups` (and of persistent groups) from LRU eviction."""
+        manifest_groups = cls.manifest()["groups"]
+        pinned = set(groups) | {name for name, group in manifest_groups.items() if group.get("persistent")}
+        names = {name for g in pinned for name in manifest_groups[g]["images"]}
+        # Las imágenes de respaldo también se muestran en la escena
+        images = cls.manifest()["images"]
+        names |= {images[name]["fallback"] for name in list(names) if "fallback" in images[name]}
+        cls._images.pin(cls._keys(names))
+
+    @classmethod
+    def scene_image(cls, name):
+        """
+        Returns the image `name` if its group is resident, falling back to the manifest's
+        fallback image or placeholder when the file could not be loaded. None if not resident.
+        """
+        groups = cls.manifest()["groups"]
+        if cls._key(name) not in cls._images and not any(name in groups[g]["images"] for g in cls._resident_groups):
+            return None
+        image = cls.get_image(name)
+        if image is not None:
+            return image
+        entry = cls.manifest()["images"][name]
+        if "fallback" in entry:
+            fallback = entry["fallback"]
+            return cls.load_image(fallback, cls.manifest()["images"][fallback]["path"])
+        w, h = entry["placeholder"]["size"]
+        image = pygame.Surface((w, h), pygame.SRCALPHA)
+        image.fill((0, 0, 0, 0))
+        pygame.draw.rect(image, entry["placeholder"]["color"], image.get_rect(), border_radius=8)
+        cls._images[cls._key(name)] = image
+        return image
+
+    @classmethod
+    def scaled_image(cls, name, size, smooth=False, preview=False):
+        """
+        Returns scene image `name` scaled to `size`, cached per (name, size, filter).
+        With `preview`, a smoothscale request is served with the cheap scale filter
+        unless the smooth copy already exists. None if the image is not resident.
+        """
+        size = (max(1, int(size[0])), max(1, int(size[1])))
+        # Los alias de imágenes idénticas comparten la copia escalada
+        base = cls._key(name)
+        if smooth and preview and (base, size, "smooth") in cls._scaled:
+            preview = False
+        flt = "smooth" if smooth and not preview else "fast"
+        key = (base, size, flt)
+        image = cls._scaled.get(key)
+        if image is None:
+            original = cls.scene_image(name)
+            if original is None:
                 return None
-        return cls._sounds[name]
+            scale = pygame.transform.smoothscale if flt == "smooth" else pygame.transform.scale
+            sprite = cls._sprites.get(key[0])
+            with profiler.span("scale." + flt):
+                if sprite is None or original.get_parent() is None:
+                    image = scale(original, size)
+                else:
+                    image = scale(cls._sprite_canvas(original, sprite[3], sprite[4]), size)
+            cls._scaled[key] = image
+        return image
+
+    @staticmethod
+    def _sprite_canvas(trimmed, offset, canvas):
+        # Devuelve el sprite a su lienzo original para escalarlo igual que el PNG suelto;
+        # la copia es temporal, en memoria solo queda el atlas y el resultado escalado
+        image = pygame.Surface(canvas, pygame.SRCALPHA)
+        image.fill((0, 0, 0, 0))
+        # MAX sobre un lienzo transparente copia los píxeles tal cual (sin mezclar el alpha)
+        image.blit(trimmed, offset, special_flags=pygame.BLEND_RGBA_MAX)
+        return image
+
+    @classmethod
+    def load_sound(cls, name, path):
+        sound = cls._sounds.get(name)
+        if sound is None:
+            sound = cls._load_sound_file(name, os.path.join(BASE_DIR, "assets", "sounds", path))
+        return sound
+
+    @classmethod
+    def _load_sound_file(cls, name, full_path):
+        try:
+            sound = pygame.mixer.Sound(full_path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Unable to load sound at {full_path}: {e}")
+            return None
+        cls._sounds[name] = sound
+        cls._sound_paths[name] = full_path
+        return sound
+
+    @classmethod
+    def get_font(cls, family, size, bold=False, italic=False):
+        """Returns a system font, looked up once per (family, size, style)."""
+        key = (family, size, bold, italic)
+        font = cls._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(family, size, bold=bold, italic=italic)
+            cls._fonts[key] = font
+        return font
+
+    @classmethod
+    def render_text(cls, text, family, size, color, bold=False, italic=False, antialias=True):
+        """Renders `text` once per (text, font, color) and returns the cached surface."""
+        key = (text, family, size, bold, italic, tuple(color), antialias)
+        surface = cls._texts.get(key)
+        if surface is None:
+            surface = cls.get_font(family, size, bold, italic).render(text, antialias, color)
+            cls._texts[key] = surface
+        return surface
 
     @classmethod
     def get_image(cls, name):
-        return cls._images.get(name)
+        """
+        Returns a loaded image, reloading it from disk if it was evicted.
+        Atlas sprites are subsurfaces of their atlas, trimmed to the visible pixels.
+        """
+        key = cls._key(name)
+        image = cls._images.get(key)
+        if image is None:
+            if key in cls._sprites and (cls._sprites[key][0] in cls._images or cls._sprites[key][0] in cls._paths):
+                image = cls._load_sprite(key)
+            elif key in cls._paths:
+                image = cls._load_image_file(key, cls._paths[key])
+        return image
 
     @classmethod
     def get_sound(cls, name):
-        return cls._sounds.get(name)
+        sound = cls._sounds.get(name)
+        if sound is None and name in cls._sound_paths:
+            sound = cls._load_sound_file(name, cls._sound_paths[name])
+        return sound
+
+    @classmethod
+    def cache_stats(cls):
+        """Hit/miss/eviction counters and memory use of each asset cache."""
+        return {
+            "images": cls._images.stats(),
+            "scaled": cls._scaled.stats(),
+            "sounds": cls._sounds.stats(),
+            "fonts": cls._fonts.stats(),
+            "texts": cls._texts.stats(),
+        }
@@ -0,0 +1,44 @@
+import time
+
+
+class SceneLayout:
+    """
+    Scaled assets and rects of one scene, built lazily.
+
+    `build(width, height)` sets the scene's attributes on the game, or returns
+    them, in which case they are kept as `view`. It runs the first time the
+    scene is shown after the window size changes (or after the scene's images
+    finish loading), so a resize only pays for the visible scene.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self.built_for = None
+        self.view = None
+        self.builds = 0
+        self.last_build_ms = 0.0
+        self.total_build_ms = 0.0
+
+    def invalidate(self):
+        self.built_for = None
+
+    def ensure(self, size, preview=False):
+        """Rebuilds the layout if it was not built for `size` (and preview quality)."""
+        key = (tuple(size), preview)
+        if self.built_for == key:
+            return False
+        t = time.perf_counter()
+        self.view = self.build(*size)
+        self.last_build_ms = (time.perf_counter() - t) * 1000
+        self.total_build_ms += self.last_build_ms
+        self.builds += 1
+        self.built_for = key
+        return True
+
+    def stats(self):
+        return {
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            "total_build_ms": self.total_build_ms,
+        }
@@ -0,0 +1,55 @@
+"""
+Startup timeline.
+
+main.py imports this module before pygame, so the clock starts right at
+launch. main.py and Game mark the end of each startup phase (imports, pygame
+init, display, menu assets, layout, first frame); with STARTUP_REPORT the
+timeline is printed once the first menu frame is on screen:
+
+    Arranque:
+      imports            231.0 ms  (  231.0)
+      pygame init         12.4 ms  (  243.4)
+      ...
+"""
+import os
+import time
+
+
+class StartupTimeline:
+    """Named marks from process start to the first presented frame."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.finished = False
+
+    def mark(self, phase):
+        """Ends `phase` now; it started at the previous mark. Ignored once finished."""
+        if not self.finished:
+            self.marks.append((phase, time.perf_counter()))
+
+    def finish(self):
+        self.finished = True
+
+    def phases(self):
+        """[(phase, ms, ms since start)] in order."""
+        result = []
+        previous = self.start
+        for phase, at in self.marks:
+            result.append((phase, (at - previous) * 1000, (at - self.start) * 1000))
+            previous = at
+        return result
+
+    def report(self):
+        lines = ["Arranque:"]
+        for phase, ms, total in self.phases():
+            lines.append(f"  {phase:<16} {ms:8.1f} ms  ({total:7.1f})")
+        return "\n".join(lines)
+
+
+# Un único timeline por proceso; empieza cuando main.py importa este módulo
+timeline = StartupTimeline()
+
+# Directorio desde el que se lanzó el juego, antes de que main.py cambie al del
+# proyecto (o al _MEIPASS temporal del ejecutable, que se borra al salir)
+launch_dir = os.getcwd()
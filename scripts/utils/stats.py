@@ -0,0 +1,13 @@
+"""
+Percentiles shared by the profiler, the playback clock and the benchmarks, so
+a p95 means the same thing in the F3 overlay, the sync report and the suite.
+"""
+import math
+
+
+def percentile(values, q):
+    """Nearest-rank percentile: the smallest value with at least `q` of the values at or below it. 0.0 if empty."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(len(values) * q) - 1)]
@@ -0,0 +1,34 @@
+import pygame
+
+
+class FrameTransition:
+    """
+    A frame frozen at the start of a transition.
+
+    The scene behind it is composed once. Each transition frame is then a fill
+    or a blit of whatever is underneath, plus one alpha blit of the frozen frame:
+    a fade to (or from) black, or a crossfade onto a live frame such as a video.
+    """
+
+    def __init__(self, source, key=None):
+        self.key = key
+        self.frame = source.copy()
+
+    def fit(self, size):
+        """Rescales the frozen frame once if the window changed size mid-transition."""
+        if self.frame.get_size() != tuple(size):
+            self.frame = pygame.transform.smoothscale(self.frame, size)
+        return self.frame
+
+    def draw_over_black(self, target, black_alpha):
+        """Fade to black: `black_alpha` 0 shows the frozen frame, 255 shows black."""
+        frame = self.fit(target.get_size())
+        target.fill((0, 0, 0))
+        frame.set_alpha(255 - int(black_alpha))
+        target.blit(frame, (0, 0))
+
+    def draw_over(self, target, frame_alpha):
+        """Crossfade: blits the frozen frame with `frame_alpha` over what `target` already shows."""
+        frame = self.fit(target.get_size())
+        frame.set_alpha(int(frame_alpha))
+        target.blit(frame, (0, 0))